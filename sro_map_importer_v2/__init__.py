@@ -2,6 +2,8 @@ import bpy
 from bpy.types import FloatAttribute, IntAttribute
 from bpy.props import (
     StringProperty,
+    BoolProperty,
+    EnumProperty,
     FloatProperty,
     IntProperty,
     CollectionProperty,
@@ -10,16 +12,36 @@ from bpy_extras.io_utils import ImportHelper
 
 import addon_utils
 
+import logging
 from time import perf_counter
+from collections import deque
+from functools import partial, wraps
+from contextlib import contextmanager
+import tempfile
 import struct
 from dataclasses import dataclass
 from pathlib import Path
 from io import BufferedReader
 from math import floor
 
-from .map_reader.map_importer import MapObjectsImporter
-
-from typing import Set, TypedDict, cast
+from .map_reader.map_importer import (
+    MapObjectsImporter,
+    PROXY_PROPERTY,
+    camera_frustum_planes,
+    proxy_region,
+)
+from .map_reader.ofile import region_id
+from .map_reader.tile2d import TextureIndex, read_tile2d_ifo
+from .map_reader.instrument import configure_logging, stats
+from .map_reader.profiling import RunProfiler
+from .map_reader.memory import MemoryTracker
+from . import region_library
+from . import merge_collections
+from . import memory_report
+from . import region_sources
+from .map_reader.fingerprint import OBJECT_SUFFIXES, TERRAIN_SUFFIXES
+
+from typing import Callable, Set, cast
 
 bl_info = {
     "name": "Blender Silkroad Map Importer",
@@ -40,7 +62,8 @@ class Config:
     panel_prefix = caps_name + "_PT_"
     operator_prefixz = caps_name + "_OT_"
 
-    path: Path
+    # overwritten below when installed, used as is by headless scripts
+    path: Path = Path(__file__).resolve().parent
 
     @staticmethod
     def get_addon_name():
@@ -48,6 +71,9 @@ class Config:
         return addon_path
 
 
+log = logging.getLogger(__name__)
+
+
 for mod in addon_utils.modules():  # type: ignore
     if mod.bl_info["name"] == bl_info["name"]:
         filepath = mod.__file__
@@ -138,24 +164,21 @@ class MapBlock:
         _ = f.read(20)
 
 
-class TextureIndex(TypedDict):
-    _id: int
-    addr: int
-    map_name: str
-    file_name: str
-
-
 class DDJTextureReader:
     def __init__(self) -> None:
         pass
 
     def convert(self, filepath: Path):
         with open(filepath, "rb") as f:
-            header = f.read(12)
-            print(header)
+            _header = f.read(12)
             texture_size, texture_type = struct.unpack("<II", f.read(8))
 
-            print(f"{texture_size=} {texture_type=}")
+            log.debug(
+                "%s texture_size=%d texture_type=%d",
+                filepath,
+                texture_size,
+                texture_type,
+            )
 
             data = f.read(texture_size - 8)
 
@@ -170,92 +193,62 @@ class MapImporter:
         self.base_path = map_path
 
     @staticmethod
+    @stats.timed("read.m")
     def read_m_file(path: Path) -> list[MapBlock]:
-        start = perf_counter()
+        stats.count("files")
+        stats.count("bytes", path.stat().st_size)
+
         with open(path, "rb") as f:
-            header = f.read(12)
-            print(header)
+            _header = f.read(12)
 
             map_blocks: list[MapBlock] = []
             for _ in range(36):
                 map_block = MapBlock(f)
                 map_blocks.append(map_block)
 
-            read_time = perf_counter() - start
-            print(f"read map block in {read_time}s")
             return map_blocks
 
     def read_tile2d_ifo(self):
-        tile2d_ifo_path = self.base_path / "tile2d.ifo"
-
-        if not tile2d_ifo_path.exists():
-            raise FileNotFoundError(
-                "tile2d.ifo not found! make sure the map_path points to the MAP data folder"
-            )
-
-        with open(tile2d_ifo_path, "r") as f:
-            lines = f.readlines()
-
-            # header = lines[0]
-            # version = lines[1]
-
-            result: dict[int, TextureIndex] = {}
-
-            for line in lines[2:]:
-                # format: 00000 0x00000000 "CJfild" "c_dust_fld_01.ddj"
-                _id, addr, *rest = line.split(" ")
-
-                if len(rest) == 2:
-                    map_name, file_name = rest
-                else:
-                    rest = " ".join(rest)
-                    map_name, file_name = rest.split('" "')
-                    if " {" in file_name:
-                        file_name = file_name.split(" {")[0]
-
-                _id = int(_id)
-                addr = int(addr, 16)
-                file_name = file_name.strip().strip('"')
-
-                if not file_name.endswith(".ddj"):
-                    print(line)
-                    print(file_name)
-                    raise ValueError("problem parsing tile2d.ifo")
-
-                value: TextureIndex = {
-                    "_id": _id,
-                    "addr": addr,
-                    "map_name": map_name.strip('"'),
-                    "file_name": file_name,
-                }
-
-                result[_id] = value
-
-            self.texture_map = result
-
-            return result
+        self.texture_map = read_tile2d_ifo(self.base_path / "tile2d.ifo")
+        return self.texture_map
 
 
 class BlenderMapImporter:
     texture_map: dict[int, TextureIndex]
     map_importer: MapImporter
 
+    # texture_id -> name of the loaded bpy image
+    images: dict[int, str]
+
     def __init__(self, map_path: Path) -> None:
         self.base_path = map_path
         self.map_importer = MapImporter(self.base_path)
         self.texture_map = self.map_importer.read_tile2d_ifo()
+        self.images = {}
 
     def create_image(self, texture_id: int, base_path: Path):
+        image_name = self.images.get(texture_id)
+        if image_name is not None:
+            image = bpy.data.images.get(image_name)
+            if image is not None:
+                stats.count("cache_hits")
+                return image
+
+        stats.count("cache_misses")
+
         texture_data = self.texture_map[texture_id]
 
         texture_path = base_path / texture_data["file_name"]
 
         dds_path = texture_path.with_suffix(".dds")
         if not dds_path.exists():
-            d = DDJTextureReader()
-            d.convert(texture_path)
+            with stats.span("convert.ddj"):
+                d = DDJTextureReader()
+                d.convert(texture_path)
 
-        image = bpy.data.images.load(dds_path.as_posix())
+        with stats.span("read.image"):
+            image = bpy.data.images.load(dds_path.as_posix(), check_existing=True)
+        self.images[texture_id] = image.name
 
         return image
 
@@ -287,6 +280,7 @@ class BlenderMapImporter:
         ntree.links.new(mix_node.inputs[0], attribute_node.outputs[2])
         return attribute_node, mix_node, uv_node
 
+    @stats.timed("build.material")
     def create_material(self, material_name: str, textures: Set[int]):
         material = bpy.data.materials.new(material_name)
         material.use_nodes = True
@@ -330,6 +324,7 @@ class BlenderMapImporter:
 
         return material
 
+    @stats.timed("build.terrain")
     def import_map(self, path: Path):
         assert bpy.context
 
@@ -337,10 +332,11 @@ class BlenderMapImporter:
 
         textures: Set[int] = set()
 
-        for map_block in map_blocks:
-            for map_vertex in map_block.map_vertices:
-                texture_id, scale = map_vertex.get_texture_data()
-                textures.add(texture_id)
+        with stats.span("decode.m"):
+            for map_block in map_blocks:
+                for map_vertex in map_block.map_vertices:
+                    texture_id, scale = map_vertex.get_texture_data()
+                    textures.add(texture_id)
 
         material = self.create_material(path.stem, textures)
 
@@ -351,7 +347,8 @@ class BlenderMapImporter:
         x_offset = int(path.stem)
         y_offset = int(path.parent.stem)
 
-        print(f"{x_offset=} {y_offset=}")
+        log.debug("importing region %d %d", x_offset, y_offset)
+        stats.count("regions")
 
         for map_block_idx, map_block in enumerate(map_blocks):
             bpy.ops.mesh.primitive_grid_add(  # type: ignore
@@ -446,6 +443,90 @@ class BlenderMapImporter:
             geo_nodes["Socket_5"] = x_offset
             geo_nodes["Socket_6"] = y_offset
 
+        region_sources.store_fingerprints(path.with_suffix(""), TERRAIN_SUFFIXES)
+
+
+class ImporterSession:
+    """
+    long-lived importer state shared by every operator invocation.
+    parsed indexes and asset caches are kept until the data/map paths change,
+    references to blender datablocks are dropped on undo and file load
+    """
+
+    map_importer: BlenderMapImporter | None
+    objects_importer: MapObjectsImporter | None
+
+    def __init__(self) -> None:
+        self.map_importer = None
+        self.objects_importer = None
+
+    def clear(self):
+        self.map_importer = None
+        self.objects_importer = None
+
+    def invalidate_datablocks(self):
+        if self.map_importer is not None:
+            self.map_importer.images.clear()
+
+        if self.objects_importer is not None:
+            self.objects_importer.imported_materials.clear()
+
+    def get_map_importer(self, map_path: Path) -> BlenderMapImporter:
+        if self.map_importer is None or self.map_importer.base_path != map_path:
+            self.map_importer = BlenderMapImporter(map_path)
+
+        return self.map_importer
+
+    def get_objects_importer(
+        self, data_path: Path, map_path: Path
+    ) -> MapObjectsImporter:
+        m = self.objects_importer
+
+        if m is None or m.DATA_PATH != data_path or m.MAP_PATH != map_path:
+            m = MapObjectsImporter(data_path=data_path, map_path=map_path)
+            self.objects_importer = m
+
+        return m
+
+    @staticmethod
+    def append_nodes():
+        nodes_name = "set_height"
+
+        if bpy.data.node_groups.get(nodes_name):
+            return
+
+        blender_path = "importer.blend"
+        path = Config.path / blender_path
+        inner_path = "NodeTree"
+
+        filepath = path / inner_path / nodes_name
+
+        bpy.ops.wm.append(
+            filepath=filepath.as_posix(),
+            directory=(path / inner_path).as_posix(),
+            filename=nodes_name,
+            check_existing=True,
+        )
+
+
+session = ImporterSession()
+
+
+def on_path_update(self, context):
+    session.clear()
+
+
+@bpy.app.handlers.persistent
+def on_datablocks_reset(*args):
+    session.invalidate_datablocks()
+
+
+handlers = [
+    bpy.app.handlers.load_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+]
+
 
 class SILKROAD_PROPERTIES(bpy.types.PropertyGroup):
     height_scale: FloatProperty(name="height", default=1)  # type: ignore
@@ -457,16 +538,111 @@ class SILKROAD_PROPERTIES(bpy.types.PropertyGroup):
     y_start: IntProperty(name="y_start", default=0)  # type: ignore
     y_size: IntProperty(name="y_size", default=1)  # type: ignore
 
+    import_objects: BoolProperty(name="import_objects", default=False)  # type: ignore
+    # seconds of work per modal tick, lower keeps the ui more responsive
+    time_budget: FloatProperty(name="time_budget", default=0.1, min=0.01)  # type: ignore
+
+    lod_mode: EnumProperty(
+        name="LOD",
+        description="Region the object level of detail is measured from",
+        items=[
+            ("ALL", "All", "Import every LOD list of every region"),
+            ("SQUARE", "Square Center", "Measure from the center of the square"),
+            ("CURSOR", "3D Cursor", "Measure from the region under the 3D cursor"),
+        ],
+        default="ALL",
+    )  # type: ignore
+    lod_near: IntProperty(name="lod_near", default=1, min=0)  # type: ignore
+    lod_far: IntProperty(name="lod_far", default=3, min=0)  # type: ignore
+
+    cull_to_camera: BoolProperty(
+        name="Cull to Camera",
+        description="Only import objects inside the scene camera frustum",
+        default=False,
+    )  # type: ignore
+    cull_margin: FloatProperty(name="margin", default=1.0, min=0)  # type: ignore
+
+    proxy_objects: BoolProperty(
+        name="Bounding Box Proxies",
+        description="Place bounding boxes, load the meshes later with Resolve Proxies",
+        default=False,
+    )  # type: ignore
+    static_batch: BoolProperty(
+        name="Static Batch",
+        description="Merge the objects of every region into one mesh per material",
+        default=False,
+    )  # type: ignore
+    import_navmesh: BoolProperty(
+        name="NavMesh",
+        description="Place the object navmesh collision meshes with the objects",
+        default=False,
+    )  # type: ignore
+
 
 class SILKROAD_ADDON_PREFERENCES(bpy.types.AddonPreferences):
     bl_idname = __package__  # type: ignore
 
     data_path: StringProperty(
-        name="DATA Path", description="SRO DATA Path", default="", subtype="DIR_PATH"
+        name="DATA Path",
+        description="SRO DATA Path",
+        default="",
+        subtype="DIR_PATH",
+        update=on_path_update,
     )  # type: ignore
 
     map_path: StringProperty(
-        name="Map Path", description="SRO Map Path", default="", subtype="DIR_PATH"
+        name="Map Path",
+        description="SRO Map Path",
+        default="",
+        subtype="DIR_PATH",
+        update=on_path_update,
+    )  # type: ignore
+
+    baked_path: StringProperty(
+        name="Baked Regions Path",
+        description="Output folder of batch.py, holding {y}/{x}.blend region files",
+        default="",
+        subtype="DIR_PATH",
+    )  # type: ignore
+
+    log_level: EnumProperty(
+        name="Log Level",
+        description="Console output, Info adds a timing summary after every import",
+        items=[
+            ("WARNING", "Warning", "Only problems"),
+            ("INFO", "Info", "Import summaries"),
+            ("DEBUG", "Debug", "Every file read"),
+        ],
+        default="WARNING",
+    )  # type: ignore
+
+    profiler: EnumProperty(
+        name="Profiler",
+        description="Profile every import operator run",
+        items=[
+            ("OFF", "Off", "No profiling"),
+            ("CPROFILE", "cProfile", "Write .prof files, open with snakeviz or pstats"),
+            (
+                "PYINSTRUMENT",
+                "pyinstrument",
+                "Write .pyisession files, needs pyinstrument in blender's python",
+            ),
+        ],
+        default="OFF",
+    )  # type: ignore
+    profile_path: StringProperty(
+        name="Profile Path",
+        description="Output folder of the profiles, the temp folder when empty",
+        default="",
+        subtype="DIR_PATH",
+    )  # type: ignore
+    profile_top: IntProperty(name="Top Functions", default=40, min=1)  # type: ignore
+
+    track_memory: BoolProperty(
+        name="Memory Report",
+        description="Report cache sizes, python allocations and the datablocks every "
+        "region adds after each import, slows imports down",
+        default=False,
     )  # type: ignore
 
     def draw(self, context):
@@ -476,6 +652,15 @@ class SILKROAD_ADDON_PREFERENCES(bpy.types.AddonPreferences):
 
         col.prop(self, "data_path")
         col.prop(self, "map_path")
+        col.prop(self, "baked_path")
+        col.prop(self, "log_level")
+
+        col.prop(self, "profiler")
+        if self.profiler != "OFF":
+            col.prop(self, "profile_path")
+            col.prop(self, "profile_top")
+
+        col.prop(self, "track_memory")
 
 
 class BaseClass:
@@ -488,7 +673,27 @@ class BaseClass:
         return bpy.context.preferences.addons[Config.get_addon_name()].preferences  # type: ignore
 
 
+def profiled(execute):
+    # runs execute under the profiler chosen in the addon preferences, the profile
+    # is written and memory tracking stopped even when execute raises
+    @wraps(execute)
+    def wrapper(self: "BaseOperator", context):
+        self.begin_profile()
+
+        try:
+            with self.profiling():
+                return execute(self, context)
+        finally:
+            self.end_stats()
+            self.end_profile()
+
+    return wrapper
+
+
 class BaseOperator(BaseClass, bpy.types.Operator):
+    profiler: RunProfiler | None = None
+    memory: MemoryTracker | None = None
+
     @staticmethod
     def select_and_make_active(ob: bpy.types.Object):
         for ob_to_deselect in bpy.data.objects:
@@ -500,7 +705,109 @@ class BaseOperator(BaseClass, bpy.types.Operator):
         bpy.context.view_layer.objects.active = ob
         ob.select_set(True)
 
-        print(f"[ Status ] {ob.name} set to Active Object")
+        log.info("%s set to Active Object", ob.name)
+
+    def begin_stats(self):
+        # counters, timings and memory cover one operator run
+        prefs = self.get_preferences()
+
+        configure_logging(__name__, prefs.log_level)
+        stats.reset()
+
+        self.memory = None
+        if prefs.track_memory:
+            self.memory = MemoryTracker()
+            self.memory.start()
+
+    def log_stats(self, summary: str):
+        log.info("%s\n%s", summary, stats.summary())
+
+        if self.memory is not None:
+            # reported whatever the log level, it was asked for in the preferences
+            report = memory_report.memory_report(self.memory, session)
+            self.report({"INFO"}, f"memory\n{report}")
+            self.memory = None
+
+    def end_stats(self):
+        # stops memory tracking of a run that ended without log_stats
+        if self.memory is not None:
+            self.memory.discard()
+            self.memory = None
+
+    def begin_profile(self):
+        prefs = self.get_preferences()
+
+        self.profiler = None
+        if prefs.profiler == "OFF":
+            return
+
+        if prefs.profile_path != "":
+            output_path = Path(bpy.path.abspath(prefs.profile_path))
+        else:
+            output_path = Path(tempfile.gettempdir()) / "sro_profiles"
+
+        self.profiler = RunProfiler(prefs.profiler, output_path, prefs.profile_top)
+
+    @contextmanager
+    def profiling(self):
+        if self.profiler is None:
+            yield
+            return
+
+        self.profiler.start()
+        try:
+            yield
+        finally:
+            self.profiler.stop()
+
+    def profile_tag(self) -> str:
+        regions = stats.counters.get("regions", 0)
+        placements = stats.counters.get("placements", 0)
+
+        return f"{regions}regions_{placements}placements"
+
+    def end_profile(self):
+        if self.profiler is None:
+            return
+
+        name = self.bl_idname.split(".")[-1]
+        path = self.profiler.dump(f"{name}_{self.profile_tag()}")
+        self.profiler = None
+
+        self.report({"INFO"}, f"profile written to {path}")
+
+    def configure_lods(self, m: MapObjectsImporter):
+        props = self.get_props()
+
+        m.lod_near = props.lod_near
+        m.lod_far = max(props.lod_far, props.lod_near)
+
+        if props.lod_mode == "SQUARE":
+            m.lod_focus = (
+                props.x_start + props.x_size // 2,
+                props.y_start + props.y_size // 2,
+            )
+        elif props.lod_mode == "CURSOR":
+            # regions are 6 units wide and offset by half a unit, see region_origin
+            cursor = bpy.context.scene.cursor.location
+            m.lod_focus = (floor((cursor.x + 0.5) / 6), floor((cursor.y + 0.5) / 6))
+        else:
+            m.lod_focus = None
+
+    def configure_culling(self, m: MapObjectsImporter) -> bool:
+        props = self.get_props()
+        scene = bpy.context.scene
+
+        m.cull_planes = None
+        if not props.cull_to_camera:
+            return True
+
+        if scene.camera is None:
+            self.report({"WARNING"}, "cull to camera needs a scene camera")
+            return False
+
+        m.cull_planes = camera_frustum_planes(scene.camera, scene, props.cull_margin)
+        return True
 
 
 class SILKROAD_OT_IMPORT_OBJECTS(BaseOperator):
@@ -515,14 +822,24 @@ class SILKROAD_OT_IMPORT_OBJECTS(BaseOperator):
         enabled_modes = ["OBJECT"]
         return context.mode in enabled_modes
 
+    @profiled
     def execute(self, context):
-        # props = self.get_props()
+        props = self.get_props()
         prefs = self.get_preferences()
 
         data_path = Path(prefs.data_path)
         map_path = Path(prefs.map_path)
 
-        m = MapObjectsImporter(data_path=data_path, map_path=map_path)
+        m = session.get_objects_importer(data_path=data_path, map_path=map_path)
+        self.configure_lods(m)
+        m.proxy = props.proxy_objects
+        m.static_batch = props.static_batch
+        m.navmesh = props.import_navmesh
+        if not self.configure_culling(m):
+            return {"CANCELLED"}
+        m.reset_registry()
+
+        self.begin_stats()
 
         for ob in bpy.data.objects:
             if "x:" in ob.name and "y:" in ob.name:
@@ -537,6 +854,9 @@ class SILKROAD_OT_IMPORT_OBJECTS(BaseOperator):
 
                 m.read_o(path)
 
+        self.report({"INFO"}, m.stats())
+        self.log_stats(m.stats())
+
         return {"FINISHED"}
 
 
@@ -567,34 +887,23 @@ class SILKROAD_OT_IMPORT(BaseOperator, ImportHelper):
         enabled_modes = ["OBJECT"]
         return context.mode in enabled_modes
 
-    def append_nodes(self):
-        blender_path = "importer.blend"
-        path = Config.path / blender_path
-        inner_path = "NodeTree"
-        nodes_name = "set_height"
-
-        filepath = path / inner_path / nodes_name
-
-        bpy.ops.wm.append(
-            filepath=filepath.as_posix(),
-            directory=(path / inner_path).as_posix(),
-            filename=nodes_name,
-            check_existing=True,
-        )
-
+    @profiled
     def execute(self, context):
         props = self.get_props()
         paths = [Path(self.directory, file.name) for file in self.files]
+        self.begin_stats()
 
         map_data_path = Path(bpy.path.abspath(props.map_data_path))
 
-        b = BlenderMapImporter(map_data_path)
+        b = session.get_map_importer(map_data_path)
 
-        self.append_nodes()
+        session.append_nodes()
 
         for path in paths:
             b.import_map(path)
 
+        self.log_stats(f"imported {len(paths)} regions")
+
         return {"FINISHED"}
 
 
@@ -610,46 +919,414 @@ class SILKROAD_OT_IMPORT_SQUARE(BaseOperator):
         enabled_modes = ["OBJECT"]
         return context.mode in enabled_modes
 
-    def append_nodes(self):
-        blender_path = "importer.blend"
-        path = Config.path / blender_path
-        inner_path = "NodeTree"
-        nodes_name = "set_height"
+    queue: deque[Callable[[], None]]
+    objects_importer: MapObjectsImporter | None
+    # datablock totals after the last region, for the memory report
+    region_totals: dict[str, int]
+    # new / changed / unchanged / untracked region counts
+    region_report: dict[str, int]
+    total: int
+    done: int
+    started: float
+
+    timer: bpy.types.Timer | None = None
+
+    # events left to the viewport while the import is running
+    passthrough_events = {
+        "MIDDLEMOUSE",
+        "WHEELUPMOUSE",
+        "WHEELDOWNMOUSE",
+        "TRACKPADPAN",
+        "TRACKPADZOOM",
+    }
+
+    def build_queue(self) -> bool:
+        props = self.get_props()
+        prefs = self.get_preferences()
 
-        filepath = path / inner_path / nodes_name
+        if prefs.map_path == "":
+            self.report(
+                {"WARNING"}, "map path empty, set Map Path in addon preferences"
+            )
+            return False
 
-        bpy.ops.wm.append(
-            filepath=filepath.as_posix(),
-            directory=(path / inner_path).as_posix(),
-            filename=nodes_name,
-            check_existing=True,
+        # map_data_path = Path(bpy.path.abspath(props.map_data_path))
+        map_data_path = Path(bpy.path.abspath(prefs.map_path))
+
+        m: MapObjectsImporter | None = None
+        if props.import_objects:
+            if prefs.data_path == "":
+                self.report(
+                    {"WARNING"}, "data path empty, set DATA Path in addon preferences"
+                )
+                return False
+
+            data_path = Path(bpy.path.abspath(prefs.data_path))
+            m = session.get_objects_importer(
+                data_path=data_path, map_path=map_data_path
+            )
+            self.configure_lods(m)
+            m.proxy = props.proxy_objects
+            m.static_batch = props.static_batch
+            m.navmesh = props.import_navmesh
+            if not self.configure_culling(m):
+                return False
+
+        regions = [
+            map_data_path / str(y) / str(x)
+            for y in range(props.y_start, props.y_start + props.y_size)
+            for x in range(props.x_start, props.x_start + props.x_size)
+            if (map_data_path / str(y) / f"{x}.m").exists()
+        ]
+
+        # regions whose sources changed are removed and imported again, this runs
+        # before the registry collects the placements already in the file
+        self.region_report = region_sources.remove_changed_regions(
+            regions, objects=m is not None
         )
 
+        if m is not None:
+            m.reset_registry()
+
+        self.objects_importer = m
+
+        self.begin_stats()
+        if self.memory is not None:
+            self.region_totals = memory_report.datablock_totals()
+
+        b = session.get_map_importer(map_data_path)
+
+        session.append_nodes()
+
+        self.queue = deque()
+
+        for region_path in regions:
+            if region_sources.region_object(region_path) is None:
+                self.queue.append(partial(b.import_map, region_path.with_suffix(".m")))
+
+            if m is not None:
+                self.queue.append(partial(self.queue_objects, m, region_path))
+
+            if self.memory is not None:
+                # runs after the placements queue_objects puts in front of it
+                self.queue.append(
+                    partial(
+                        self.account_region,
+                        int(region_path.stem),
+                        int(region_path.parent.stem),
+                    )
+                )
+
+        self.total = len(self.queue)
+        self.done = 0
+        self.started = perf_counter()
+
+        return True
+
+    def queue_objects(self, m: MapObjectsImporter, path: Path):
+        region_sources.store_fingerprints(path, OBJECT_SUFFIXES)
+
+        if m.static_batch:
+            # the whole region is merged in one step
+            m.batch_region(path)
+            return
+
+        # placements of a region run right after it is read, while m points at it,
+        # followed by one pass applying all of their transforms
+        count = m.begin_region(path)
+
+        items = [partial(m.import_placement, idx) for idx in range(count)]
+        items.append(m.finish_region)
+
+        self.queue.extendleft(reversed(items))
+        self.total += len(items)
+
+    def account_region(self, x: int, y: int):
+        assert self.memory
+        totals = memory_report.datablock_totals()
+
+        delta = memory_report.totals_delta(self.region_totals, totals)
+        self.memory.add_region(f"x: {x}, y: {y}", delta)
+
+        self.region_totals = totals
+
+    def run_queue(self, budget: float | None = None):
+        start = perf_counter()
+
+        while self.queue:
+            item = self.queue.popleft()
+            item()
+            self.done += 1
+
+            if budget is not None and perf_counter() - start >= budget:
+                break
+
+    def status_text(self) -> str:
+        elapsed = perf_counter() - self.started
+        remaining = self.total - self.done
+
+        eta = elapsed / self.done * remaining if self.done else 0.0
+
+        return (
+            f"SRO import {self.done}/{self.total}, "
+            f"ETA {eta:.0f}s, press ESC to stop and keep imported"
+        )
+
+    def profile_tag(self) -> str:
+        props = self.get_props()
+
+        return (
+            f"x{props.x_start}_y{props.y_start}_{props.x_size}x{props.y_size}_"
+            f"{super().profile_tag()}"
+        )
+
+    def summary(self) -> str:
+        text = f"imported {self.done}/{self.total} items"
+
+        report = self.region_report
+        text += (
+            f", regions {report['new']} new, {report['changed']} changed, "
+            f"{report['unchanged']} unchanged"
+        )
+        if report["untracked"]:
+            text += f", {report['untracked']} imported without fingerprints"
+
+        if self.objects_importer is not None:
+            text += f", {self.objects_importer.stats()}"
+
+        return text
+
+    def finish(self, context: bpy.types.Context):
+        wm = context.window_manager
+
+        if self.timer is not None:
+            wm.event_timer_remove(self.timer)
+            self.timer = None
+
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+
+        self.end_profile()
+
+    @profiled
     def execute(self, context):
+        if not self.build_queue():
+            return {"CANCELLED"}
+
+        self.run_queue()
+        self.report({"INFO"}, self.summary())
+        self.log_stats(self.summary())
+
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        self.begin_profile()
+
+        try:
+            with self.profiling():
+                queued = self.build_queue()
+        except Exception:
+            self.end_stats()
+            self.end_profile()
+            raise
+
+        if not queued:
+            self.end_profile()
+            return {"CANCELLED"}
+
+        if not self.queue:
+            self.report({"INFO"}, self.summary())
+            self.log_stats(self.summary())
+            self.end_profile()
+            return {"FINISHED"}
+
+        wm = context.window_manager
+
+        self.timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        wm.progress_begin(0, 1)
+
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context, event):
+        if event.type == "ESC":
+            if self.objects_importer is not None:
+                # place what was created of the current region
+                self.objects_importer.finish_region()
+
+            self.finish(context)
+            self.report({"INFO"}, f"import stopped, {self.summary()}")
+            self.log_stats(f"import stopped, {self.summary()}")
+            # FINISHED keeps an undo step for what was already built
+            return {"FINISHED"}
+
+        if event.type in self.passthrough_events:
+            return {"PASS_THROUGH"}
+
+        if event.type != "TIMER":
+            return {"RUNNING_MODAL"}
+
         props = self.get_props()
+
+        try:
+            # only the queue work is profiled, not the time between timer events
+            with self.profiling():
+                self.run_queue(props.time_budget)
+        except Exception as e:
+            if self.objects_importer is not None:
+                self.objects_importer.finish_region()
+
+            self.finish(context)
+            self.report({"ERROR"}, f"import failed: {e}")
+            self.log_stats(f"import failed: {e}")
+            return {"FINISHED"}
+
+        if not self.queue:
+            self.finish(context)
+            self.report({"INFO"}, self.summary())
+            self.log_stats(self.summary())
+            return {"FINISHED"}
+
+        context.window_manager.progress_update(self.done / self.total)
+        context.workspace.status_text_set(self.status_text())
+
+        return {"RUNNING_MODAL"}
+
+
+class SILKROAD_OT_RESOLVE_PROXIES(BaseOperator):
+    bl_idname = "silkroad.resolve_proxies"
+    bl_label = "Resolve Proxies"
+    bl_description = "Replace bounding box proxies with the full object meshes"
+    bl_options = {"REGISTER", "UNDO"}
+
+    only_selected: BoolProperty(name="Only Selected", default=True)  # type: ignore
+    only_region: BoolProperty(
+        name="Only Region",
+        description="Only resolve proxies placed by the region at x, y",
+        default=False,
+    )  # type: ignore
+    region_x: IntProperty(name="Region X", default=0, min=0, max=255)  # type: ignore
+    region_y: IntProperty(name="Region Y", default=0, min=0, max=255)  # type: ignore
+
+    @classmethod
+    def poll(cls, context: bpy.types.Context | None) -> bool:
+        assert context
+        enabled_modes = ["OBJECT"]
+        return context.mode in enabled_modes
+
+    @profiled
+    def execute(self, context):
         prefs = self.get_preferences()
 
-        if prefs.map_path == "":
+        if prefs.data_path == "":
             self.report(
-                {"WARNING"}, "map path empty, set Map Path in addon preferences"
+                {"WARNING"}, "data path empty, set DATA Path in addon preferences"
             )
             return {"CANCELLED"}
 
-        # map_data_path = Path(bpy.path.abspath(props.map_data_path))
-        map_data_path = Path(bpy.path.abspath(prefs.map_path))
+        self.begin_stats()
+
+        obs = context.selected_objects if self.only_selected else bpy.data.objects
+        proxies = [ob for ob in obs if PROXY_PROPERTY in ob]
+
+        if self.only_region:
+            owner = region_id(self.region_x, self.region_y)
+            proxies = [ob for ob in proxies if proxy_region(ob) == owner]
+
+        m = session.get_objects_importer(
+            data_path=Path(bpy.path.abspath(prefs.data_path)),
+            map_path=Path(bpy.path.abspath(prefs.map_path)),
+        )
+        resolved = m.resolve_proxies(proxies)
+
+        self.report({"INFO"}, f"resolved {resolved} of {len(proxies)} proxies")
+        self.log_stats(f"resolved {resolved} of {len(proxies)} proxies")
+
+        return {"FINISHED"}
+
+
+class SILKROAD_OT_MERGE_COLLECTIONS(BaseOperator):
+    bl_idname = "silkroad.merge_collections"
+    bl_label = "Merge Collections"
+    bl_description = "Join the meshes of every placement collection into one object"
+    bl_options = {"REGISTER", "UNDO"}
+
+    region_prefix: StringProperty(
+        name="Region Prefix",
+        description='Only merge collections starting with it, "x-y-" for one region',
+        default="",
+    )  # type: ignore
+
+    @classmethod
+    def poll(cls, context: bpy.types.Context | None) -> bool:
+        assert context
+        enabled_modes = ["OBJECT"]
+        return context.mode in enabled_modes
+
+    @profiled
+    def execute(self, context):
+        self.begin_stats()
+
+        merged = merge_collections.merge_meshes_in_collections(self.region_prefix)
+        self.report({"INFO"}, f"merged {merged} collections")
+        self.log_stats(f"merged {merged} collections")
+
+        return {"FINISHED"}
+
+
+class SILKROAD_OT_LINK_REGIONS(BaseOperator):
+    bl_idname = "silkroad.link_regions"
+    bl_label = "Link Baked Regions"
+    bl_description = "Link pre-baked region .blend files for the square"
+    bl_options = {"REGISTER", "UNDO"}
+
+    unload_outside: BoolProperty(name="Unload Outside", default=True)  # type: ignore
+
+    @classmethod
+    def poll(cls, context: bpy.types.Context | None) -> bool:
+        assert context
+        enabled_modes = ["OBJECT"]
+        return context.mode in enabled_modes
+
+    def execute(self, context):
+        props = self.get_props()
+        prefs = self.get_preferences()
 
-        b = BlenderMapImporter(map_data_path)
+        if prefs.baked_path == "":
+            self.report(
+                {"WARNING"},
+                "baked path empty, set Baked Regions Path in addon preferences",
+            )
+            return {"CANCELLED"}
 
-        self.append_nodes()
+        baked_path = Path(bpy.path.abspath(prefs.baked_path))
+
+        linked, unloaded, missing = region_library.assemble_window(
+            baked_path,
+            props.x_start,
+            props.x_size,
+            props.y_start,
+            props.y_size,
+            unload_outside=self.unload_outside,
+        )
+
+        self.report(
+            {"INFO"},
+            f"linked {linked} regions, unloaded {unloaded}, {missing} not baked",
+        )
+
+        return {"FINISHED"}
+
+
+class SILKROAD_OT_UNLINK_REGIONS(BaseOperator):
+    bl_idname = "silkroad.unlink_regions"
+    bl_label = "Unlink Baked Regions"
+    bl_description = "Remove every linked region library"
+    bl_options = {"REGISTER", "UNDO"}
 
-        for y in range(props.y_start, props.y_start + props.y_size):
-            for x in range(props.x_start, props.x_start + props.x_size):
-                path = map_data_path / str(y) / (str(x) + ".m")
-                if path.exists():
-                    name = f"x: {x}, y: {y}"
-                    if bpy.data.objects.get(name):
-                        continue
-                    b.import_map(path)
+    def execute(self, context):
+        unloaded = region_library.unload_all()
+        self.report({"INFO"}, f"unloaded {unloaded} regions")
 
         return {"FINISHED"}
 
@@ -679,6 +1356,28 @@ class SILKROAD_PT_viewportSidePanel(BaseClass, bpy.types.Panel):
         row.prop(props, "x_size")
         row.prop(props, "y_size")
 
+        row = col.row()
+        row.prop(props, "import_objects")
+        row.prop(props, "time_budget")
+
+        col.prop(props, "lod_mode")
+        if props.lod_mode != "ALL":
+            row = col.row()
+            row.prop(props, "lod_near")
+            row.prop(props, "lod_far")
+
+        row = col.row()
+        row.prop(props, "cull_to_camera")
+        row.prop(props, "cull_margin")
+
+        row = col.row()
+        row.prop(props, "proxy_objects")
+        row.operator(SILKROAD_OT_RESOLVE_PROXIES.bl_idname, text="Resolve")
+        row = col.row()
+        row.prop(props, "static_batch")
+        row.operator(SILKROAD_OT_MERGE_COLLECTIONS.bl_idname, text="Merge")
+        col.prop(props, "import_navmesh")
+
         row = col.row()
         row.operator(
             SILKROAD_OT_IMPORT_SQUARE.bl_idname,
@@ -697,6 +1396,15 @@ class SILKROAD_PT_viewportSidePanel(BaseClass, bpy.types.Panel):
             icon="NODE_TEXTURE",
         )
 
+        col.separator()
+        row = col.row()
+        row.operator(
+            SILKROAD_OT_LINK_REGIONS.bl_idname, text="Link Square", icon="LINKED"
+        )
+        row.operator(
+            SILKROAD_OT_UNLINK_REGIONS.bl_idname, text="Unlink All", icon="UNLINKED"
+        )
+
 
 classes = [
     SILKROAD_PROPERTIES,
@@ -704,6 +1412,10 @@ classes = [
     SILKROAD_PT_viewportSidePanel,
     SILKROAD_OT_IMPORT_SQUARE,
     SILKROAD_OT_IMPORT_OBJECTS,
+    SILKROAD_OT_RESOLVE_PROXIES,
+    SILKROAD_OT_MERGE_COLLECTIONS,
+    SILKROAD_OT_LINK_REGIONS,
+    SILKROAD_OT_UNLINK_REGIONS,
     SILKROAD_ADDON_PREFERENCES,
 ]
 
@@ -730,10 +1442,19 @@ def register():
 
     set_properties()
 
+    for handler in handlers:
+        handler.append(on_datablocks_reset)
+
 
 def unregister():
     from bpy.utils import unregister_class
 
+    for handler in handlers:
+        if on_datablocks_reset in handler:
+            handler.remove(on_datablocks_reset)
+
+    session.clear()
+
     for cls in reversed(classes):
         unregister_class(cls)
 
@@ -0,0 +1,240 @@
+"""
+headless region to .blend conversion, one file per region written to <output>/{y}/{x}.blend
+
+    blender --background --python sro_map_importer_v2/batch.py -- \\
+        <Map path> --data-path <Data path> --x-start 64 --x-size 10 --y-start 90 --y-size 10 \\
+        --output baked --workers 8 --objects
+
+the coordinator only splits the region window and launches background blender workers,
+it also runs under a plain python interpreter when --blender points at the executable
+"""
+
+import argparse
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+
+
+def region_blend_path(output_path: Path, x: int, y: int) -> Path:
+    return output_path / str(y) / f"{x}.blend"
+
+
+def region_collection_name(x: int, y: int) -> str:
+    # same key as the terrain object created by import_map
+    return f"x: {x}, y: {y}"
+
+
+def parse_args(argv: list[str]):
+    parser = argparse.ArgumentParser(description="bake SRO regions into .blend files")
+
+    parser.add_argument("map_path", type=Path, help="SRO Map folder")
+    parser.add_argument("--data-path", type=Path, help="SRO Data folder, for objects")
+    parser.add_argument("--output", type=Path, required=True, help="output folder")
+
+    parser.add_argument("--x-start", type=int, default=0)
+    parser.add_argument("--x-size", type=int, default=1)
+    parser.add_argument("--y-start", type=int, default=0)
+    parser.add_argument("--y-size", type=int, default=1)
+
+    parser.add_argument("--objects", action="store_true", help="import .o2 objects")
+    parser.add_argument("--overwrite", action="store_true")
+
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--blender", type=str, help="blender executable")
+
+    # set by the coordinator, "x,y;x,y;..."
+    parser.add_argument("--worker-regions", type=str, help=argparse.SUPPRESS)
+
+    args = parser.parse_args(argv)
+
+    if args.objects and args.data_path is None:
+        parser.error("--objects requires --data-path")
+
+    return args
+
+
+def script_args() -> list[str]:
+    # blender passes everything after "--" through to the script
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1 :]
+
+    return sys.argv[1:]
+
+
+def find_regions(args) -> list[tuple[int, int]]:
+    regions: list[tuple[int, int]] = []
+
+    for y in range(args.y_start, args.y_start + args.y_size):
+        for x in range(args.x_start, args.x_start + args.x_size):
+            if not (args.map_path / str(y) / f"{x}.m").exists():
+                continue
+
+            if not args.overwrite and region_blend_path(args.output, x, y).exists():
+                continue
+
+            regions.append((x, y))
+
+    return regions
+
+
+def blender_executable(args) -> str:
+    if args.blender:
+        return args.blender
+
+    try:
+        import bpy
+
+        return bpy.app.binary_path
+    except ImportError:
+        raise SystemExit("not running inside blender, pass --blender")
+
+
+def run_coordinator(args) -> int:
+    regions = find_regions(args)
+
+    if len(regions) == 0:
+        print("[ Batch ] nothing to do")
+        return 0
+
+    worker_count = max(1, min(args.workers, len(regions)))
+    slices = [regions[idx::worker_count] for idx in range(worker_count)]
+
+    blender = blender_executable(args)
+
+    forwarded = [
+        args.map_path.as_posix(),
+        "--output",
+        args.output.as_posix(),
+    ]
+    if args.data_path is not None:
+        forwarded += ["--data-path", args.data_path.as_posix()]
+    if args.objects:
+        forwarded.append("--objects")
+    if args.overwrite:
+        forwarded.append("--overwrite")
+
+    start = perf_counter()
+
+    workers: list[subprocess.Popen] = []
+    for regions_slice in slices:
+        worker_regions = ";".join(f"{x},{y}" for x, y in regions_slice)
+
+        command = [
+            blender,
+            "--background",
+            "--factory-startup",
+            "--python",
+            Path(__file__).resolve().as_posix(),
+            "--",
+            *forwarded,
+            "--worker-regions",
+            worker_regions,
+        ]
+
+        workers.append(subprocess.Popen(command))
+
+    print(f"[ Batch ] {len(regions)} regions on {worker_count} workers")
+
+    failed = 0
+    for worker in workers:
+        if worker.wait() != 0:
+            failed += 1
+
+    print(
+        f"[ Batch ] done in {perf_counter() - start:.1f}s, {failed} workers failed"
+    )
+
+    return 1 if failed else 0
+
+
+def load_addon():
+    addon_path = Path(__file__).resolve().parent
+
+    if addon_path.parent.as_posix() not in sys.path:
+        sys.path.insert(0, addon_path.parent.as_posix())
+
+    return importlib.import_module(addon_path.name)
+
+
+def bake_region(addon, args, x: int, y: int):
+    import bpy
+
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    addon.session.invalidate_datablocks()
+
+    scene = bpy.context.scene
+
+    map_path = args.map_path
+    m_path = map_path / str(y) / f"{x}.m"
+
+    b = addon.session.get_map_importer(map_path)
+    addon.session.append_nodes()
+
+    b.import_map(m_path)
+
+    has_objects = any(m_path.with_suffix(suffix).exists() for suffix in (".o2", ".o"))
+    if args.objects and not has_objects:
+        # terrain only regions are still baked
+        print(f"[ Batch ] region {x} {y} has no .o2 or .o, skipping objects")
+    elif args.objects:
+        m = addon.session.get_objects_importer(
+            data_path=args.data_path, map_path=map_path
+        )
+        m.reset_registry()
+        m.import_region(m_path.with_suffix(""))
+
+    # everything placed in the region goes under one collection so it can be linked
+    region_collection = bpy.data.collections.new(region_collection_name(x, y))
+
+    for ob in list(scene.collection.objects):
+        region_collection.objects.link(ob)
+        scene.collection.objects.unlink(ob)
+
+    for child in list(scene.collection.children):
+        # bms_import holds the source objects the placements are duplicated from
+        if child.name == "bms_import":
+            continue
+
+        region_collection.children.link(child)
+        scene.collection.children.unlink(child)
+
+    scene.collection.children.link(region_collection)
+
+    blend_path = region_blend_path(args.output, x, y)
+    blend_path.parent.mkdir(parents=True, exist_ok=True)
+
+    bpy.ops.wm.save_as_mainfile(filepath=blend_path.as_posix(), compress=True)
+
+
+def run_worker(args) -> int:
+    addon = load_addon()
+
+    regions = [
+        (int(x), int(y))
+        for x, y in (item.split(",") for item in args.worker_regions.split(";"))
+    ]
+
+    failed = 0
+    for x, y in regions:
+        start = perf_counter()
+        try:
+            bake_region(addon, args, x, y)
+        except Exception as e:
+            failed += 1
+            print(f"[ Batch ] region {x} {y} failed: {e}")
+            continue
+
+        print(f"[ Batch ] region {x} {y} baked in {perf_counter() - start:.1f}s")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    args = parse_args(script_args())
+
+    if args.worker_regions:
+        sys.exit(run_worker(args))
+
+    sys.exit(run_coordinator(args))
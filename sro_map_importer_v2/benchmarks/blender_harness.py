@@ -0,0 +1,268 @@
+"""
+time the blender side of an import (terrain, materials, objects) on synthetic windows
+
+    blender --background --factory-startup \\
+        --python sro_map_importer_v2/benchmarks/blender_harness.py -- \\
+        --output results.json --baseline baseline.json --tolerance 0.25
+
+stages nest, terrain.import includes terrain.read and terrain.materials,
+objects.import includes every other objects stage.
+with --baseline the run fails when a stage is slower than the baseline by more than
+the tolerance or when the datablock counts differ
+"""
+
+import argparse
+import importlib
+import json
+import sys
+import tempfile
+import types
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Callable
+
+import bpy
+
+ADDON_PATH = Path(__file__).resolve().parents[1]
+
+# the addon package from its parent folder, the way batch.load_addon imports it,
+# batch itself is a module of that package
+sys.path.insert(0, ADDON_PATH.parent.as_posix())
+batch = importlib.import_module(".batch", ADDON_PATH.name)
+
+# synthetic is a headless script, it imports map_reader from the addon folder
+sys.path.insert(1, ADDON_PATH.as_posix())
+
+from benchmarks.synthetic import (  # noqa: E402
+    X_START,
+    Y_START,
+    SyntheticConfig,
+    build_dataset,
+)
+
+
+@dataclass
+class Scenario:
+    name: str
+    config: SyntheticConfig
+    objects: bool = True
+
+
+SCENARIOS = [
+    Scenario("window_1x1", SyntheticConfig(regions=1, objects=1)),
+    Scenario("window_5x5", SyntheticConfig(regions=5, objects=1)),
+    Scenario("window_20x20", SyntheticConfig(regions=20, objects=1)),
+    # 36 blocks * 4 lods * 64 = 9216 placements over 32 resources
+    Scenario("dense_objects", SyntheticConfig(regions=1, objects=64, resources=32)),
+]
+
+
+@dataclass
+class Stage:
+    seconds: float = 0.0
+    calls: int = 0
+
+
+@dataclass
+class StageTimer:
+    stages: dict[str, Stage] = field(default_factory=dict)
+    restore: list[Callable[[], None]] = field(default_factory=list)
+
+    def wrap(self, owner, attribute: str, stage: str):
+        # times every call of owner.attribute, owner is an instance or a module
+        original = getattr(owner, attribute)
+        timing = self.stages.setdefault(stage, Stage())
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                timing.seconds += perf_counter() - start
+                timing.calls += 1
+
+        setattr(owner, attribute, timed)
+
+        if isinstance(owner, types.ModuleType):
+            self.restore.append(lambda: setattr(owner, attribute, original))
+        else:
+            self.restore.append(lambda: delattr(owner, attribute))
+
+    def unwrap(self):
+        for restore in reversed(self.restore):
+            restore()
+        self.restore = []
+
+
+def datablock_counts() -> dict[str, int]:
+    return {
+        "objects": len(bpy.data.objects),
+        "meshes": len(bpy.data.meshes),
+        "materials": len(bpy.data.materials),
+        "images": len(bpy.data.images),
+        "collections": len(bpy.data.collections),
+        "node_groups": len(bpy.data.node_groups),
+        "vertices": sum(len(mesh.vertices) for mesh in bpy.data.meshes),
+        "polygons": sum(len(mesh.polygons) for mesh in bpy.data.meshes),
+    }
+
+
+def run_scenario(addon, scenario: Scenario, root: Path) -> dict:
+    map_path, data_path = build_dataset(root / scenario.name, scenario.config)
+
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    addon.session.clear()
+
+    timer = StageTimer()
+
+    b = addon.session.get_map_importer(map_path)
+    addon.session.append_nodes()
+
+    timer.wrap(b, "import_map", "terrain.import")
+    timer.wrap(b.map_importer, "read_m_file", "terrain.read")
+    timer.wrap(b, "create_material", "terrain.materials")
+
+    m = None
+    if scenario.objects:
+        m = addon.session.get_objects_importer(data_path=data_path, map_path=map_path)
+        m.reset_registry()
+
+        timer.wrap(m, "import_region", "objects.import")
+        timer.wrap(m, "read_resource", "objects.read_bsr")
+        timer.wrap(m, "read_bms", "objects.read_bms")
+        timer.wrap(m, "import_materials", "objects.materials")
+        timer.wrap(addon.map_reader.map_importer, "import_bms", "objects.build_bms")
+        timer.wrap(m, "finish_region", "objects.transforms")
+
+    regions = scenario.config.regions
+    start = perf_counter()
+
+    try:
+        for y in range(Y_START, Y_START + regions):
+            for x in range(X_START, X_START + regions):
+                path = map_path / str(y) / f"{x}.m"
+
+                b.import_map(path)
+
+                if m is not None:
+                    m.import_region(path.with_suffix(""))
+    finally:
+        timer.unwrap()
+
+    seconds = perf_counter() - start
+
+    return {
+        "regions": regions * regions,
+        "seconds": seconds,
+        "seconds_per_region": seconds / (regions * regions),
+        "placements": m.registry.stats() if m is not None else None,
+        "stages": {name: asdict(stage) for name, stage in timer.stages.items()},
+        "datablocks": datablock_counts(),
+    }
+
+
+def compare(
+    results: dict, baseline: dict, tolerance: float, min_seconds: float
+) -> list[str]:
+    # regressions against a previous results file, scenarios missing on either side
+    # are skipped
+    regressions: list[str] = []
+
+    for name, result in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+
+        timings = {"total": (result["seconds"], base["seconds"])}
+        for stage, timing in result["stages"].items():
+            base_stage = base["stages"].get(stage)
+            if base_stage is not None:
+                timings[stage] = (timing["seconds"], base_stage["seconds"])
+
+        for stage, (seconds, base_seconds) in timings.items():
+            # ignore noise on stages too short to measure
+            if seconds - base_seconds < min_seconds:
+                continue
+
+            if seconds > base_seconds * (1 + tolerance):
+                regressions.append(
+                    f"{name} {stage}: {seconds:.3f}s, baseline {base_seconds:.3f}s"
+                )
+
+        for key, count in result["datablocks"].items():
+            base_count = base["datablocks"].get(key)
+            if base_count is not None and count != base_count:
+                regressions.append(
+                    f"{name} {key}: {count} datablocks, baseline {base_count}"
+                )
+
+    return regressions
+
+
+def parse_args(argv: list[str]):
+    parser = argparse.ArgumentParser(description="benchmark the blender importers")
+
+    parser.add_argument("--output", type=Path, required=True, help="json results")
+    parser.add_argument("--baseline", type=Path, help="json results to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-seconds", type=float, default=0.05)
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=[scenario.name for scenario in SCENARIOS],
+        default=[scenario.name for scenario in SCENARIOS],
+    )
+    parser.add_argument("--dataset-path", type=Path, help="keep the synthetic data")
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    addon = batch.load_addon()
+
+    scenarios = [scenario for scenario in SCENARIOS if scenario.name in args.scenarios]
+
+    results = {
+        "blender": bpy.app.version_string,
+        "python": sys.version.split()[0],
+        "scenarios": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.dataset_path or Path(tmp)
+
+        for scenario in scenarios:
+            result = run_scenario(addon, scenario, root)
+            results["scenarios"][scenario.name] = result
+
+            print(
+                f"[ Benchmark ] {scenario.name} {result['regions']} regions "
+                f"in {result['seconds']:.2f}s, "
+                f"{result['datablocks']['objects']} objects"
+            )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+
+    if args.baseline is None:
+        return 0
+
+    regressions = compare(
+        results,
+        json.loads(args.baseline.read_text()),
+        args.tolerance,
+        args.min_seconds,
+    )
+
+    for regression in regressions:
+        print(f"[ Benchmark ] regression {regression}")
+
+    print(f"[ Benchmark ] {len(regressions)} regressions against {args.baseline}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(batch.script_args()))
@@ -0,0 +1,220 @@
+"""
+time every map_reader parser over a synthetic Map / Data folder
+
+usage (from the sro_map_importer_v2 folder, no blender required):
+    python -m benchmarks.parsers --regions 4 --objects 16 --output parsers.json
+    python -m benchmarks.parsers --dataset <folder from benchmarks.synthetic>
+"""
+
+import argparse
+import json
+import platform
+import tempfile
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Callable
+
+import numpy as np
+
+from benchmarks.synthetic import SyntheticConfig, build_dataset
+from map_reader.bmt import BMT
+from map_reader.bms_reader import load_bms
+from map_reader.bsr import BSRReader
+from map_reader.ddj import DDJTextureReader
+from map_reader.mfile import read_map_blocks
+from map_reader.nvm import read_nvm, scan_nvm
+from map_reader.object_list import read_object_list
+from map_reader.ofile import read_placements, region_id
+from map_reader.tile2d import read_tile2d_ifo
+
+
+@dataclass
+class Parser:
+    name: str
+    unit: str
+    paths: list[Path]
+    # parses one file, returns the number of records of unit it holds
+    read: Callable[[Path], int]
+    # runs before every pass, outside of the timings
+    reset: Callable[[], None] | None = None
+
+
+@dataclass
+class ParserResult:
+    name: str
+    unit: str
+    files: int
+    bytes: int
+    records: int
+    seconds: float
+    mb_per_s: float
+    records_per_s: float
+    peak_memory: int
+
+
+def read_o(path: Path) -> int:
+    # Map/{y}/{x}.o
+    x, y = int(path.stem), int(path.parent.name)
+    return len(read_placements(path, region_id(x, y)))
+
+
+def read_bmt(path: Path) -> int:
+    bmt = BMT()
+    bmt.read(path)
+    return len(bmt.materials)
+
+
+def read_bsr(path: Path) -> int:
+    BSRReader().read(path)
+    return 1
+
+
+def read_ddj(path: Path) -> int:
+    DDJTextureReader.convert_ddj_to_dds(path)
+    return 1
+
+
+def remove_dds(paths: list[Path]) -> Callable[[], None]:
+    # convert_ddj_to_dds skips textures already converted
+    def reset():
+        for path in paths:
+            path.with_suffix(".dds").unlink(missing_ok=True)
+
+    return reset
+
+
+def dataset_parsers(map_path: Path, data_path: Path) -> list[Parser]:
+    regions = sorted(map_path.glob("*/*.m"))
+    ddj = sorted(map_path.glob("tile2d/*.ddj")) + sorted(data_path.rglob("*.ddj"))
+
+    return [
+        Parser("m", "blocks", regions, lambda p: len(read_map_blocks(p))),
+        Parser("o", "placements", [p.with_suffix(".o") for p in regions], read_o),
+        Parser("o2", "placements", [p.with_suffix(".o2") for p in regions], read_o),
+        Parser(
+            "object.ifo",
+            "resources",
+            [map_path / "object.ifo"],
+            lambda p: len(read_object_list(p)),
+        ),
+        Parser(
+            "tile2d.ifo",
+            "textures",
+            [map_path / "tile2d.ifo"],
+            lambda p: len(read_tile2d_ifo(p)),
+        ),
+        Parser("bsr", "resources", sorted(data_path.rglob("*.bsr")), read_bsr),
+        Parser("bmt", "materials", sorted(data_path.rglob("*.bmt")), read_bmt),
+        Parser(
+            "bms",
+            "vertices",
+            sorted(data_path.rglob("*.bms")),
+            lambda p: len(load_bms(p)["vertices"]),
+        ),
+        Parser("ddj", "textures", ddj, read_ddj, remove_dds(ddj)),
+        Parser(
+            "nvm",
+            "cells",
+            scan_nvm(data_path / "navmesh"),
+            lambda p: len(read_nvm(p).cells),
+        ),
+    ]
+
+
+def run_pass(parser: Parser) -> tuple[int, float]:
+    if parser.reset is not None:
+        parser.reset()
+
+    start = perf_counter()
+    records = sum(parser.read(path) for path in parser.paths)
+    seconds = perf_counter() - start
+
+    return records, seconds
+
+
+def measure(parser: Parser, repeat: int) -> ParserResult:
+    records, seconds = run_pass(parser)
+    for _ in range(repeat - 1):
+        seconds = min(seconds, run_pass(parser)[1])
+
+    # separate pass, tracemalloc slows every allocation down
+    tracemalloc.start()
+    run_pass(parser)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size = sum(path.stat().st_size for path in parser.paths)
+    seconds = max(seconds, 1e-9)
+
+    return ParserResult(
+        name=parser.name,
+        unit=parser.unit,
+        files=len(parser.paths),
+        bytes=size,
+        records=records,
+        seconds=seconds,
+        mb_per_s=size / seconds / 1e6,
+        records_per_s=records / seconds,
+        peak_memory=peak_memory,
+    )
+
+
+def run(map_path: Path, data_path: Path, repeat: int) -> list[ParserResult]:
+    return [
+        measure(parser, repeat)
+        for parser in dataset_parsers(map_path, data_path)
+        if parser.paths
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="benchmark the map_reader parsers")
+    parser.add_argument("--dataset", type=Path, help="existing synthetic folder")
+    parser.add_argument("--regions", type=int, default=2)
+    parser.add_argument("--objects", type=int, default=16)
+    parser.add_argument("--resources", type=int, default=16)
+    parser.add_argument("--mesh-side", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="json file, stdout when omitted")
+
+    args = parser.parse_args()
+
+    config = SyntheticConfig(
+        regions=args.regions,
+        objects=args.objects,
+        resources=args.resources,
+        mesh_side=args.mesh_side,
+        seed=args.seed,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.dataset is not None:
+            map_path, data_path = args.dataset / "Map", args.dataset / "Data"
+        else:
+            map_path, data_path = build_dataset(Path(tmp), config)
+
+        results = run(map_path, data_path, args.repeat)
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "config": asdict(config) if args.dataset is None else None,
+        "repeat": args.repeat,
+        "results": [asdict(result) for result in results],
+    }
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+
+        for result in results:
+            print(
+                f"[ Benchmark ] {result.name:<10} {result.files:>5} files "
+                f"{result.mb_per_s:>9.2f} MB/s "
+                f"{result.records_per_s:>12.0f} {result.unit}/s "
+                f"peak {result.peak_memory / 1e6:.2f} MB"
+            )
+    else:
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,453 @@
+"""
+synthetic but format valid map / data folders, layouts follow map_reader/hexpat
+
+    Map/object.ifo, Map/tile2d.ifo, Map/tile2d/*.ddj
+    Map/{y}/{x}.m, .o, .o2
+    Data/res/synthetic/*.bsr, Data/prim/mtrl/synthetic/*.bmt + .ddj,
+    Data/prim/mesh/synthetic/*.bms, Data/navmesh/nv_*.nvm
+
+usage (from the sro_map_importer_v2 folder, no blender required):
+    python -m benchmarks.synthetic <output folder> --regions 2 --objects 8
+"""
+
+import argparse
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from map_reader.mfile import (
+    BLOCK_COUNT,
+    MAP_BLOCK_DTYPE,
+    REGION_SIZE,
+    REGION_VERTICES,
+)
+from map_reader.nvm import (
+    NVM_CELL_DTYPE,
+    NVM_GLOBAL_EDGE_DTYPE,
+    NVM_INTERNAL_EDGE_DTYPE,
+    NVM_OBJECT_DTYPE,
+    NVM_TILE_DTYPE,
+    NVM_TILES,
+    nvm_path,
+)
+from map_reader.ofile import O2_OBJECT_DTYPE, O_OBJECT_DTYPE, region_id
+
+
+LODS = 4
+
+# first region of the window, well inside the valid region ids
+X_START = 100
+Y_START = 100
+
+
+@dataclass
+class SyntheticConfig:
+    # regions per side of the square window
+    regions: int = 1
+    # placements per block lod list
+    objects: int = 4
+    # distinct resources in object.ifo, each with its own bsr / bmt / bms / ddj
+    resources: int = 8
+    # vertices per side of the bms grid mesh
+    mesh_side: int = 8
+    # nav cells per side of every bms navmesh and nvm region
+    nav_side: int = 4
+    textures: int = 4
+    texture_size: int = 64
+    seed: int = 0
+
+
+def ascii_string(value: str) -> bytes:
+    data = value.encode("cp1252")
+    return struct.pack("<I", len(data)) + data
+
+
+def dds_bytes(size: int, rng: np.random.Generator) -> bytes:
+    # uncompressed 32 bit rgba, no mipmaps
+    header = struct.pack(
+        "<4s7I44x8I5I",
+        b"DDS ",
+        124,
+        0x100F,
+        size,
+        size,
+        size * 4,
+        0,
+        0,
+        32,
+        0x41,
+        0,
+        32,
+        0x00FF0000,
+        0x0000FF00,
+        0x000000FF,
+        0xFF000000,
+        0x1000,
+        0,
+        0,
+        0,
+        0,
+    )
+    pixels = rng.integers(0, 256, size * size * 4, dtype=np.uint8).tobytes()
+
+    return header + pixels
+
+
+def write_ddj(path: Path, size: int, rng: np.random.Generator):
+    dds = dds_bytes(size, rng)
+    # texture_size counts itself and texture_type, see ddj.hexpat
+    path.write_bytes(b"JMXVDDJ 1000" + struct.pack("<II", len(dds) + 8, 3) + dds)
+
+
+def write_m(path: Path, textures: int, rng: np.random.Generator):
+    blocks = np.zeros(BLOCK_COUNT, dtype=MAP_BLOCK_DTYPE)
+
+    vertices = blocks["vertices"]
+    vertices["height"] = rng.uniform(-50, 200, vertices.shape)
+    # texture id in the low 10 bits, scale above
+    vertices["texture_data"] = rng.integers(0, textures, vertices.shape) | (1 << 10)
+    vertices["brightness"] = rng.integers(0, 256, vertices.shape)
+
+    blocks["tile_map"] = rng.integers(0, textures, blocks["tile_map"].shape)
+    blocks["height_max"] = vertices["height"].max(axis=1)
+    blocks["height_min"] = vertices["height"].min(axis=1)
+
+    path.write_bytes(b"JMXVMAPM1000" + blocks.tobytes())
+
+
+def placement_records(
+    dtype: np.dtype, count: int, resources: int, uid_start: int, rng
+) -> np.ndarray:
+    records = np.zeros(count, dtype=dtype)
+
+    records["ob_id"] = rng.integers(0, resources, count)
+    records["x"] = rng.uniform(0, REGION_SIZE, count)
+    records["y"] = rng.uniform(0, 100, count)
+    records["z"] = rng.uniform(0, REGION_SIZE, count)
+    records["yaw"] = rng.uniform(0, 2 * np.pi, count)
+    records["uid"] = np.arange(uid_start, uid_start + count)
+    records["is_big"] = rng.random(count) < 0.1
+
+    return records
+
+
+def write_o(path: Path, x: int, y: int, config: SyntheticConfig, rng):
+    dtype = O2_OBJECT_DTYPE if path.suffix == ".o2" else O_OBJECT_DTYPE
+
+    data = bytearray(b"JMXVMAPO1001")
+    uid = 0
+    for _ in range(BLOCK_COUNT):
+        for _ in range(LODS):
+            records = placement_records(
+                dtype, config.objects, config.resources, uid, rng
+            )
+            if dtype is O2_OBJECT_DTYPE:
+                records["region_id"] = region_id(x, y)
+
+            data += struct.pack("<H", len(records)) + records.tobytes()
+            uid += len(records)
+
+    path.write_bytes(bytes(data))
+
+
+def write_object_ifo(path: Path, resources: list[str]):
+    lines = ["JMXVOBJI1000", str(len(resources))]
+    for idx, resource in enumerate(resources):
+        lines.append(f'{idx:05d} 0x00000000 "{resource}"')
+
+    path.write_bytes(("\n".join(lines) + "\n").encode("latin-1"))
+
+
+def write_tile2d_ifo(path: Path, textures: list[str]):
+    lines = ["JMXV2DTI1001", str(len(textures))]
+    for idx, texture in enumerate(textures):
+        lines.append(f'{idx:05d} 0x00000000 "synthetic" "{texture}"')
+
+    path.write_text("\n".join(lines) + "\n")
+
+
+def write_bsr(path: Path, name: str, material: str, mesh: str, side: float):
+    header_size = 12 + 8 * 4 + 5 * 4
+    resource = struct.pack("<I", 1) + ascii_string(name)
+
+    bbox = (
+        ascii_string(mesh)
+        + struct.pack("<6f", 0, 0, 0, side, side * 0.25, side)
+        + struct.pack("<6f", 0, 0, 0, side, side * 0.25, side)
+        + struct.pack("<I", 0)
+    )
+    materials = struct.pack("<I", 1) + struct.pack("<I", 0) + ascii_string(material)
+    # is_prim_mesh is set, every mesh carries a flag
+    meshes = struct.pack("<I", 1) + ascii_string(mesh) + struct.pack("<I", 0)
+    empty = struct.pack("<I", 0)
+
+    p_bbox = header_size + len(resource)
+    p_material = p_bbox + len(bbox)
+    p_mesh = p_material + len(materials)
+    p_empty = p_mesh + len(meshes)
+
+    pointers = struct.pack(
+        "<8I",
+        p_material,
+        p_mesh,
+        p_empty,
+        p_empty,
+        p_empty,
+        p_empty,
+        p_empty,
+        p_bbox,
+    )
+    flags = struct.pack("<5I", 1, 0, 0, 0, 0)
+
+    sections = resource + bbox + materials + meshes + empty
+
+    path.write_bytes(b"JMXVRES 0109" + pointers + flags + sections)
+
+
+def write_bmt(path: Path, material: str, diffuse: str):
+    # diffuse and alpha option bits, see bmt.hexpat
+    options = (1 << 8) | (1 << 9)
+
+    data = (
+        struct.pack("<I", 1)
+        + ascii_string(material)
+        + struct.pack("<16f", *([1.0] * 16))
+        + struct.pack("<fI", 0, options)
+        + ascii_string(diffuse)
+        + struct.pack("<fBB?", 1, 0, 0, False)
+    )
+
+    path.write_bytes(b"JMXVBMT 0102" + data)
+
+
+def grid_mesh(side: int, size: float):
+    # (side * side, 3) x / y / z vertices and (2 * (side - 1) ** 2, 3) triangles
+    ticks = np.linspace(0, size, side, dtype=np.float32)
+    x, z = np.meshgrid(ticks, ticks)
+    vertices = np.stack([x.ravel(), np.zeros(side * side, np.float32), z.ravel()], 1)
+
+    steps = np.arange(side - 1)
+    corner = (steps[None, :] + steps[:, None] * side).ravel()
+    faces = np.concatenate(
+        [
+            np.stack([corner, corner + side, corner + 1], 1),
+            np.stack([corner + 1, corner + side, corner + side + 1], 1),
+        ]
+    )
+
+    return vertices, faces
+
+
+def write_bms(path: Path, name: str, material: str, config: SyntheticConfig):
+    size = 100.0
+
+    vertices, faces = grid_mesh(config.mesh_side, size)
+    nav_vertices, nav_faces = grid_mesh(config.nav_side + 1, size)
+
+    body = bytearray()
+    body += ascii_string(name) + ascii_string(material) + struct.pack("<I", 0)
+
+    # position, normal, uv and 12 unknown bytes, no lightmap / morph data
+    vertex = np.zeros(
+        len(vertices),
+        dtype=[("co", "<f4", (3,)), ("normal", "<f4", (3,)), ("uv", "<f4", (2,))],
+    )
+    vertex["co"] = vertices
+    vertex["normal"] = (0, 1, 0)
+    vertex["uv"] = vertices[:, [0, 2]] / size
+    vertex_bytes = np.zeros((len(vertices), vertex.itemsize + 12), dtype=np.uint8)
+    vertex_bytes[:, : vertex.itemsize] = vertex.view(np.uint8).reshape(
+        len(vertices), -1
+    )
+
+    body += struct.pack("<I", len(vertices)) + vertex_bytes.tobytes()
+    body += struct.pack("<I", 0)
+    body += struct.pack("<I", len(faces)) + faces.astype("<u2").tobytes()
+    body += struct.pack("<II", 0, 0)
+    body += struct.pack("<6f", 0, 0, 0, size, 0, size)
+
+    header_size = 12 + 15 * 4
+    nav_offset = header_size + len(body)
+
+    nav = bytearray()
+    nav_vertex = np.zeros(len(nav_vertices), dtype=[("co", "<f4", (3,)), ("n", "u1")])
+    nav_vertex["co"] = nav_vertices
+    nav += struct.pack("<I", len(nav_vertices)) + nav_vertex.tobytes()
+
+    nav_cell = np.zeros(len(nav_faces), dtype=[("v", "<u2", (3,)), ("flag", "<u2")])
+    nav_cell["v"] = nav_faces
+    nav += struct.pack("<I", len(nav_faces)) + nav_cell.tobytes()
+
+    # the outline of the grid as global edges, no internal edges
+    side = config.nav_side + 1
+    border = np.arange(side - 1)
+    outline = np.concatenate(
+        [
+            np.stack([border, border + 1], 1),
+            np.stack([border * side, (border + 1) * side], 1),
+        ]
+    )
+    nav_edge = np.zeros(
+        len(outline),
+        dtype=[("v", "<u2", (2,)), ("cells", "<u2", (2,)), ("flag", "u1")],
+    )
+    nav_edge["v"] = outline
+    nav_edge["flag"] = 3
+    nav += struct.pack("<I", len(outline)) + nav_edge.tobytes()
+    nav += struct.pack("<I", 0)
+
+    # lookup grid, every global edge listed in the single grid cell
+    nav += struct.pack("<ffIII", 0, 0, 1, 1, 1)
+    grid_edges = np.arange(len(outline), dtype="<u2")
+    nav += struct.pack("<I", len(outline)) + grid_edges.tobytes()
+
+    # section offsets, only the navmesh one is read, then flags and vertex flags
+    offsets = [0] * 7 + [nav_offset, 0, 0]
+    header = struct.pack("<10I", *offsets) + struct.pack("<5I", 0, 0, 0, 0, 0)
+
+    path.write_bytes(b"JMXVBMS 0110" + header + bytes(body) + bytes(nav))
+
+
+def write_nvm(path: Path, x: int, y: int, config: SyntheticConfig, rng):
+    data = bytearray(b"JMXVNVM 1000")
+
+    objects = np.zeros(config.objects, dtype=NVM_OBJECT_DTYPE)
+    objects["ob_id"] = rng.integers(0, config.resources, len(objects))
+    objects["x"] = rng.uniform(0, REGION_SIZE, len(objects))
+    objects["z"] = rng.uniform(0, REGION_SIZE, len(objects))
+    objects["uid"] = np.arange(len(objects))
+    objects["region_id"] = region_id(x, y)
+    data += struct.pack("<H", len(objects)) + objects.tobytes()
+
+    # a regular grid of cells, each listing one object
+    side = config.nav_side
+    cell_size = REGION_SIZE / side
+    cells = np.zeros(side * side, dtype=NVM_CELL_DTYPE)
+    col, row = np.meshgrid(np.arange(side), np.arange(side))
+    cells["min"] = np.stack([col.ravel(), row.ravel()], 1) * cell_size
+    cells["max"] = cells["min"] + cell_size
+    cells["object_count"] = 1 if len(objects) else 0
+
+    cell_bytes = np.zeros((len(cells), NVM_CELL_DTYPE.itemsize + 2), dtype=np.uint8)
+    cell_bytes[:, : NVM_CELL_DTYPE.itemsize] = cells.view(np.uint8).reshape(
+        len(cells), -1
+    )
+    cell_object = (np.arange(len(cells)) % max(len(objects), 1)).astype("<u2")
+    cell_bytes[:, NVM_CELL_DTYPE.itemsize :] = cell_object.view(np.uint8).reshape(
+        -1, 2
+    )
+    if not len(objects):
+        cell_bytes = cell_bytes[:, : NVM_CELL_DTYPE.itemsize]
+
+    data += struct.pack("<II", len(cells), len(cells)) + cell_bytes.tobytes()
+
+    # vertical edges between neighbouring cells, the region border is global
+    edge_x = np.arange(side + 1) * cell_size
+    edges = np.zeros((side + 1) * side, dtype=NVM_INTERNAL_EDGE_DTYPE)
+    ex, ez = np.meshgrid(edge_x, np.arange(side) * cell_size)
+    edges["a"] = np.stack([ex.ravel(), ez.ravel()], 1)
+    edges["b"] = edges["a"] + (0, cell_size)
+    edges["flag"] = rng.integers(0, 4, len(edges))
+
+    border = (edges["a"][:, 0] == 0) | (edges["a"][:, 0] == REGION_SIZE)
+    global_edges = np.zeros(int(border.sum()), dtype=NVM_GLOBAL_EDGE_DTYPE)
+    for name in NVM_INTERNAL_EDGE_DTYPE.names:
+        global_edges[name] = edges[border][name]
+    global_edges["src_region"] = region_id(x, y)
+
+    internal_edges = edges[~border]
+
+    data += struct.pack("<I", len(global_edges)) + global_edges.tobytes()
+    data += struct.pack("<I", len(internal_edges)) + internal_edges.tobytes()
+
+    tiles = np.zeros(NVM_TILES * NVM_TILES, dtype=NVM_TILE_DTYPE)
+    tiles["texture_id"] = rng.integers(0, config.textures, len(tiles))
+    data += tiles.tobytes()
+
+    heights = rng.uniform(-50, 200, REGION_VERTICES * REGION_VERTICES)
+    data += heights.astype("<f4").tobytes()
+
+    path.write_bytes(bytes(data))
+
+
+def resource_names(idx: int) -> dict[str, str]:
+    return {
+        "bsr": f"res/synthetic/obj_{idx}.bsr",
+        "bmt": f"prim/mtrl/synthetic/obj_{idx}.bmt",
+        "ddj": f"prim/mtrl/synthetic/obj_{idx}.ddj",
+        "bms": f"prim/mesh/synthetic/obj_{idx}.bms",
+        "material": f"synthetic_{idx}",
+    }
+
+
+def build_dataset(root: Path, config: SyntheticConfig) -> tuple[Path, Path]:
+    # returns (Map path, Data path)
+    rng = np.random.default_rng(config.seed)
+
+    map_path = root / "Map"
+    data_path = root / "Data"
+
+    (map_path / "tile2d").mkdir(parents=True, exist_ok=True)
+    (data_path / "navmesh").mkdir(parents=True, exist_ok=True)
+    for folder in ("res/synthetic", "prim/mtrl/synthetic", "prim/mesh/synthetic"):
+        (data_path / folder).mkdir(parents=True, exist_ok=True)
+
+    textures = [f"synthetic_{idx:02d}.ddj" for idx in range(config.textures)]
+    write_tile2d_ifo(map_path / "tile2d.ifo", textures)
+    for texture in textures:
+        write_ddj(map_path / "tile2d" / texture, config.texture_size, rng)
+
+    resources: list[str] = []
+    for idx in range(config.resources):
+        names = resource_names(idx)
+        resources.append(names["bsr"])
+
+        write_bsr(
+            data_path / names["bsr"],
+            f"obj_{idx}",
+            names["bmt"],
+            names["bms"],
+            100.0,
+        )
+        write_bmt(data_path / names["bmt"], names["material"], Path(names["ddj"]).name)
+        write_ddj(data_path / names["ddj"], config.texture_size, rng)
+        write_bms(data_path / names["bms"], f"obj_{idx}", names["material"], config)
+
+    write_object_ifo(map_path / "object.ifo", resources)
+
+    for y in range(Y_START, Y_START + config.regions):
+        region_folder = map_path / str(y)
+        region_folder.mkdir(exist_ok=True)
+
+        for x in range(X_START, X_START + config.regions):
+            write_m(region_folder / f"{x}.m", config.textures, rng)
+            write_o(region_folder / f"{x}.o", x, y, config, rng)
+            write_o(region_folder / f"{x}.o2", x, y, config, rng)
+            write_nvm(nvm_path(data_path / "navmesh", x, y), x, y, config, rng)
+
+    return map_path, data_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="write a synthetic Map / Data folder")
+    parser.add_argument("output_path", type=Path)
+    parser.add_argument("--regions", type=int, default=1)
+    parser.add_argument("--objects", type=int, default=4)
+    parser.add_argument("--resources", type=int, default=8)
+    parser.add_argument("--mesh-side", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    build_dataset(
+        args.output_path,
+        SyntheticConfig(
+            regions=args.regions,
+            objects=args.objects,
+            resources=args.resources,
+            mesh_side=args.mesh_side,
+            seed=args.seed,
+        ),
+    )
@@ -0,0 +1,340 @@
+from pathlib import Path
+import struct
+
+import numpy as np
+
+from .nvm import counts_to_offsets, gather_runs, scan_records
+
+
+NAV_VERTEX_DTYPE = np.dtype([("co", "<f4", (3,)), ("normal", "u1")])
+
+NAV_CELL_DTYPE = np.dtype([("vertices", "<u2", (3,)), ("flag", "<u2")])
+NAV_CELL_FLAGGED_DTYPE = np.dtype(NAV_CELL_DTYPE.descr + [("unknown", "u1")])
+
+NAV_EDGE_DTYPE = np.dtype(
+    [("vertices", "<u2", (2,)), ("cells", "<u2", (2,)), ("flag", "u1")]
+)
+NAV_EDGE_FLAGGED_DTYPE = np.dtype(NAV_EDGE_DTYPE.descr + [("unknown", "u1")])
+
+
+# lookup grid cells are 100 units wide, see Generate2DLookupGrid in ref/JellyBMS.py
+NAV_GRID_CELL_SIZE = 100.0
+
+
+def nav_grid_edges(data, x: float, y: float) -> np.ndarray:
+    # global edges, the first rows of nav_edges, near the local point x / y
+    width = data["nav_grid_width"]
+    height = data["nav_grid_height"]
+
+    origin_x, origin_y = data["nav_grid_origin"]
+    col = int((x - origin_x) // NAV_GRID_CELL_SIZE)
+    row = int((y - origin_y) // NAV_GRID_CELL_SIZE)
+
+    if not (0 <= col < width and 0 <= row < height):
+        return np.empty(0, dtype=np.uint16)
+
+    offsets = data["nav_grid_offsets"]
+    cell = row * width + col
+
+    return data["nav_grid_edges"][offsets[cell] : offsets[cell + 1]]
+
+
+def edge_keys(edges: np.ndarray) -> np.ndarray:
+    # order independent int64 key of (E, 2) vertex index pairs
+    edges = np.sort(edges.astype(np.int64), axis=1)
+    return (edges[:, 0] << 32) | edges[:, 1]
+
+
+def get_edge_key(vertex_index_a, vertex_index_b):
+    return (
+        (str(vertex_index_a) + "," + str(vertex_index_b))
+        if (vertex_index_a < vertex_index_b)
+        else (str(vertex_index_b) + "," + str(vertex_index_a))
+    )
+
+
+class BinaryReader:
+    def __init__(self, Buffer):
+        self.buffer = Buffer
+        self.length = len(Buffer)
+        self.position = 0
+
+    def seek_read(self, Offset, SeekOrigin=0):
+        if SeekOrigin == 1:  # Current
+            self.position += Offset
+        elif SeekOrigin == 2:  # End
+            self.position = self.length + Offset
+        else:  # Begin
+            self.position = Offset
+
+    def read(self, format, size):
+        result = struct.unpack_from(format, self.buffer, self.position)[0]
+        self.position += size
+        return result
+
+    def read_bytes(self, count):
+        return self.read("<" + str(count) + "s", count)
+
+    def read_byte(self):
+        return self.read("<B", 1)
+
+    def read_s_byte(self):
+        return self.read("<b", 1)
+
+    def read_u16(self):
+        return self.read("<H", 2)
+
+    def read_i16(self):
+        return self.read("<h", 2)
+
+    def read_u32(self):
+        return self.read("<I", 4)
+
+    def read_i32(self):
+        return self.read("<i", 4)
+
+    def read_float32(self):
+        return self.read("<f", 4)
+
+    def read_u64(self):
+        return self.read("<q", 8)
+
+    def read_i64(self):
+        return self.read("<Q", 8)
+
+    def read_string(self, count, code_page):
+        return self.read_bytes(count).decode(code_page)
+
+    def read_ascii(self, count: int):
+        return self.read_string(count, "cp1252")
+
+
+def load_bms(filepath: Path):
+    f = open(filepath, "rb")
+    br = BinaryReader(f.read())
+
+    # data to be loaded
+    data = {
+        "name": "",
+        "material": "",
+        "vertices": [],
+        "vertices_uv": [],
+        "lightmap_uv": [],
+        "lightmap_path": "",
+        "vertex_groups": [],
+        "faces": [],
+        "vertex_clothes": {},
+        "edge_clothes": {},
+        "cloth_settings": {},
+        "bounding_box": {},
+        "nav_vertices": np.empty((0, 3), dtype=np.float32),
+        "nav_vertices_normals": np.empty(0, dtype=np.uint8),
+        "nav_cells": np.empty((0, 3), dtype=np.int32),
+        "nav_edges": np.empty((0, 2), dtype=np.int32),
+        "nav_edge_flags": np.empty(0, dtype=np.uint8),
+        "nav_edge_global": np.empty(0, dtype=bool),
+        "nav_events": [],
+        "nav_grid_origin": (0.0, 0.0),
+        "nav_grid_width": 0,
+        "nav_grid_height": 0,
+        "nav_grid_offsets": np.zeros(1, dtype=np.int64),
+        "nav_grid_edges": np.empty(0, dtype=np.uint16),
+    }
+
+    # Skip header
+    br.seek_read(12, 1)
+
+    # File Offsets (Vertices, Vertex Groups, Faces, Vertex Clothes, Edge Clothes, Bounding Box, OcclusionPortals, NavMesh, Skinned NavMesh, Unknown09)
+    br.seek_read(28, 1)
+    offsetNavMesh = br.read_u32()
+    br.seek_read(4, 1)
+    br.seek_read(4, 1)
+    br.seek_read(4, 1)
+    navFlag = br.read_u32()  # 0 = None, 1 = Edge, 2 = Cell, 4 = Event
+    br.seek_read(4, 1)
+    vertexFlag = br.read_u32()
+    br.seek_read(4, 1)
+
+    # Name & Material
+    data["name"] = br.read_ascii(br.read_i32())
+    data["material"] = br.read_ascii(br.read_i32())
+    br.seek_read(4, 1)
+
+    # File Offset: Vertices
+    vertices = data["vertices"]
+    vertices_uv = data["vertices_uv"]
+    lightmap_uv = data["lightmap_uv"]
+    verticesCount = br.read_u32()
+    for i in range(verticesCount):
+        # Location
+        x = br.read_float32()
+        z = br.read_float32()
+        y = br.read_float32()
+        vertices.append([x, y, z])
+        # Normal
+        br.seek_read(12, 1)
+        # UV Location
+        u = br.read_float32()
+        v = br.read_float32()
+        vertices_uv.append([u, 1 - v])
+        # Check LightMap
+        if vertexFlag & 0x400:
+            u = br.read_float32()
+            v = br.read_float32()
+            lightmap_uv.append([u, 1 - v])
+        # Check MorphingData
+        if vertexFlag & 0x800:
+            br.seek_read(32, 1)
+        br.seek_read(12, 1)
+    # LightMap Path
+    if vertexFlag & 0x400:
+        data["lightmap_path"] = br.read_ascii(br.read_u32())
+    # ISROR vertex data
+    if vertexFlag & 0x1000:
+        br.seek_read(br.read_u32() * 24, 1)
+
+    # File Offset: Vertex Groups
+    vertexGroups = data["vertex_groups"]
+    vertexGroupsCount = br.read_u32()
+    if vertexGroupsCount:
+        for i in range(vertexGroupsCount):
+            name = br.read_ascii(br.read_i32())
+            # Add vertex group
+            vertexGroups.append({"name": name, "vertex_index": [], "vertex_weight": []})
+        for i in range(verticesCount):
+            # Weights limit by mesh (2)
+            for j in range(2):
+                vertexGroupIndex = br.read_byte()
+                vertexWeight = br.read_u16()
+                if vertexGroupIndex != 0xFF:
+                    # Add weight to vertex
+                    vg = vertexGroups[vertexGroupIndex]
+                    vg["vertex_index"].append(i)
+                    vg["vertex_weight"].append(vertexWeight / 0xFFFF)
+
+    # File Offset: Faces
+    faces = data["faces"]
+    facesCount = br.read_u32()
+    for i in range(facesCount):
+        # Indices to vertices (triangle mesh)
+        a = br.read_u16()
+        b = br.read_u16()
+        c = br.read_u16()
+        # Add face
+        faces.append([a, b, c])
+
+    # File Offset: Vertex Clothes
+    vertexClothes = data["vertex_clothes"]
+    vertexClothesCount = br.read_u32()
+    for i in range(vertexClothesCount):
+        distance = br.read_float32()
+        isPinned = br.read_u32() == 1
+        # Add cloth from vertex
+        vertexClothes[i] = {"distance": distance, "is_pinned": isPinned}
+
+    # File Offset: Edge Clothes
+    edgeClothes = data["edge_clothes"]
+    edgeClothesCount = br.read_u32()
+    if edgeClothesCount:
+        for i in range(edgeClothesCount):
+            a = br.read_u32()
+            b = br.read_u32()
+            distance = br.read_float32()
+            # Add it
+            edgeClothes[get_edge_key(a, b)] = {
+                "vertex_index_a": a,
+                "vertex_index_b": b,
+                "distance": distance,
+            }
+        # skip it
+        br.seek_read(edgeClothesCount * 4, 1)
+
+        # Cloth simulation parameters
+        cloth_settings = data["cloth_settings"]
+
+        cloth_settings["type"] = br.read_u32()
+        cloth_settings["offset_x"] = br.read_float32()
+        cloth_settings["offset_z"] = br.read_float32()
+        cloth_settings["offset_y"] = br.read_float32()
+        cloth_settings["speed"] = br.read_float32()
+        unkUInt01 = br.read_float32()
+        unkUInt02 = br.read_float32()
+        cloth_settings["elasticity"] = br.read_float32()
+        cloth_settings["movements"] = br.read_i32()
+
+    bbox = data["bounding_box"]
+    for i in range(2):
+        x = br.read_float32()
+        z = br.read_float32()
+        y = br.read_float32()
+        bbox["min" if i == 0 else "max"] = [x, y, z]
+
+    # hasOcclusionPortal = br.ReadUInt()
+    # ...
+    # unknown = br.ReadUInt()
+
+    # FileOffset: NavMesh
+    if offsetNavMesh:
+        br.seek_read(offsetNavMesh)
+
+        # fixed size records, read straight from the buffer
+        navVerticesCount = br.read_u32()
+        navVertices = np.frombuffer(
+            br.buffer, NAV_VERTEX_DTYPE, navVerticesCount, br.position
+        )
+        br.seek_read(navVertices.nbytes, 1)
+        # x, z, y in the file
+        data["nav_vertices"] = navVertices["co"][:, [0, 2, 1]]
+        data["nav_vertices_normals"] = navVertices["normal"]
+
+        cellDtype = NAV_CELL_FLAGGED_DTYPE if navFlag & 2 else NAV_CELL_DTYPE
+        navCellsCount = br.read_u32()
+        navCells = np.frombuffer(br.buffer, cellDtype, navCellsCount, br.position)
+        br.seek_read(navCells.nbytes, 1)
+        data["nav_cells"] = navCells["vertices"].astype(np.int32)
+
+        edgeDtype = NAV_EDGE_FLAGGED_DTYPE if navFlag & 1 else NAV_EDGE_DTYPE
+        navEdges = []
+        for isGlobal in (True, False):
+            navEdgesCount = br.read_u32()
+            edges = np.frombuffer(br.buffer, edgeDtype, navEdgesCount, br.position)
+            br.seek_read(edges.nbytes, 1)
+            navEdges.append((edges, isGlobal))
+
+        data["nav_edges"] = np.concatenate(
+            [edges["vertices"] for edges, _ in navEdges]
+        ).astype(np.int32)
+        data["nav_edge_flags"] = np.concatenate(
+            [edges["flag"] for edges, _ in navEdges]
+        )
+        data["nav_edge_global"] = np.concatenate(
+            [np.full(len(edges), isGlobal) for edges, isGlobal in navEdges]
+        )
+
+        # For display only
+        if navFlag & 4:
+            navEvents = data["nav_events"]
+            eventCount = br.read_u32()
+            for i in range(eventCount):
+                navEvents.append(br.read_ascii(br.read_u32()))
+
+        # GlobalLookupGrid, per grid cell the global edges crossing it
+        data["nav_grid_origin"] = (br.read_float32(), br.read_float32())
+        width = br.read_u32()
+        height = br.read_u32()
+        br.seek_read(4, 1)
+
+        gridOffsets, gridCounts, end = scan_records(
+            br.buffer, br.position, width * height, 4, "<I", 2
+        )
+        data["nav_grid_width"] = width
+        data["nav_grid_height"] = height
+        data["nav_grid_offsets"] = counts_to_offsets(gridCounts)
+        data["nav_grid_edges"] = gather_runs(
+            np.frombuffer(br.buffer, dtype=np.uint8), gridOffsets + 4, gridCounts * 2
+        ).view("<u2")
+        br.seek_read(end)
+
+    f.close()
+
+    return data
@@ -1,9 +1,13 @@
+import logging
 import struct
 from pathlib import Path
 from dataclasses import dataclass
 from io import BufferedReader
 
 
+log = logging.getLogger(__name__)
+
+
 @dataclass
 class RGB:
     r: float
@@ -56,15 +60,13 @@ class BMT:
         return d
 
     def read(self, path: Path):
-        print("[ BMTReader ] reading", path)
+        log.debug("reading %s", path)
 
         self.path = path.parent
 
         with open(path, "rb") as f:
             _header = f.read(12)
 
-            print(_header)
-
             material_count = struct.unpack("<I", f.read(4))[0]
 
             for _ in range(material_count):
@@ -100,12 +102,8 @@ class BMT:
                     diffuse=diffuse,
                 )
 
-                print(material)
-
                 self.materials.append(material)
 
-        print("[ BMTReader ] succesful read")
-
 
 if __name__ == "__main__":
     b = BMT()
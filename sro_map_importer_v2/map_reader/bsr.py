@@ -1,3 +1,4 @@
+import logging
 from pathlib import Path
 import struct
 from io import BufferedReader
@@ -5,6 +6,8 @@ from dataclasses import dataclass
 
 POINTERS = "<IIIIIIII"
 
+log = logging.getLogger(__name__)
+
 
 @dataclass
 class BSRMaterial:
@@ -29,6 +32,7 @@ class Bbox:
 class BSRData:
     materials: list[BSRMaterial]
     meshes: list[Mesh]
+    bbox: Bbox | None = None
 
 
 class BSRReader:
@@ -102,7 +106,7 @@ class BSRReader:
         if filepath.suffix != ".bsr":
             return
 
-        print("[ BSRReader ] reading", filepath)
+        log.debug("reading %s", filepath)
 
         with open(filepath, "rb") as f:
             _header = f.read(12)
@@ -125,16 +129,17 @@ class BSRReader:
             res_type, n = struct.unpack("<II", f.read(8))
             name = f.read(n)
 
-            print(f"{res_type=} {name=}")
+            log.debug("res_type=%s name=%s", res_type, name)
 
             self.read_bbox(f)
 
             self.read_materials(f)
 
             self.read_meshes(f)
-            print("[ BSRReader ] succesful read")
 
-            bsr_data = BSRData(materials=self.materials, meshes=self.meshes)
+            bsr_data = BSRData(
+                materials=self.materials, meshes=self.meshes, bbox=self.bbox_info
+            )
 
             return bsr_data
 
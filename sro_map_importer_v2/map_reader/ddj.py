@@ -1,20 +1,27 @@
+import logging
 from pathlib import Path
 import struct
 
 
+log = logging.getLogger(__name__)
+
+
 class DDJTextureReader:
-    
     @staticmethod
     def convert_ddj_to_dds(filepath: Path) -> Path:
         if filepath.with_suffix(".dds").exists():
             return filepath.with_suffix(".dds")
 
         with open(filepath, "rb") as f:
-            header = f.read(12)
-            print(header)
+            _header = f.read(12)
             texture_size, texture_type = struct.unpack("<II", f.read(8))
 
-            print(f"{texture_size=} {texture_type=}")
+            log.debug(
+                "%s texture_size=%d texture_type=%d",
+                filepath,
+                texture_size,
+                texture_type,
+            )
 
             data = f.read(texture_size - 8)
 
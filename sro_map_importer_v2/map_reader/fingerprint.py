@@ -0,0 +1,59 @@
+import hashlib
+from pathlib import Path
+
+
+# region sources, Map/{y}/{x} + suffix
+TERRAIN_SUFFIXES = (".m",)
+OBJECT_SUFFIXES = (".o", ".o2")
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+
+def file_fingerprint(path: Path) -> dict | None:
+    if not path.exists():
+        return None
+
+    stat = path.stat()
+
+    return {"size": stat.st_size, "mtime": stat.st_mtime, "hash": file_hash(path)}
+
+
+def region_fingerprints(region_path: Path, suffixes: tuple[str, ...]) -> dict:
+    # suffix -> fingerprint of the existing sources, region_path is Map/{y}/{x}
+    fingerprints = {}
+
+    for suffix in suffixes:
+        fingerprint = file_fingerprint(region_path.with_suffix(suffix))
+        if fingerprint is not None:
+            fingerprints[suffix] = fingerprint
+
+    return fingerprints
+
+
+def file_changed(stored: dict | None, path: Path) -> bool:
+    # a touched file with the same content does not count as a change
+    if stored is None:
+        return path.exists()
+
+    if not path.exists():
+        return True
+
+    stat = path.stat()
+    if stat.st_size != stored["size"]:
+        return True
+
+    # same size and mtime is trusted, otherwise the content decides
+    if stat.st_mtime == stored["mtime"]:
+        return False
+
+    return file_hash(path) != stored["hash"]
+
+
+def changed_suffixes(stored: dict, region_path: Path, suffixes: tuple[str, ...]):
+    return {
+        suffix
+        for suffix in suffixes
+        if file_changed(stored.get(suffix), region_path.with_suffix(suffix))
+    }
@@ -0,0 +1,171 @@
+"""
+world-wide terrain height atlas built from every Map/{y}/{x}.m file
+
+usage (from the sro_map_importer_v2 folder, no blender required):
+    python -m map_reader.height_atlas <Map path> <output folder>
+"""
+
+import argparse
+import logging
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+from .mfile import BLOCK_TILES, BLOCKS_PER_SIDE, REGION_VERTICES
+from .mfile import read_region_heights, scan_regions
+
+
+log = logging.getLogger(__name__)
+
+
+HEIGHTS_FILE = "heights.npy"
+INDEX_FILE = "index.npz"
+
+# vertices a region adds to the atlas once the shared seam is removed
+REGION_STEP = BLOCKS_PER_SIDE * BLOCK_TILES
+
+
+class HeightAtlas:
+    # float32 (rows, cols) memmap, row = z, NaN where no region exists
+    heights: np.ndarray
+
+    # region coordinates of atlas element [0, 0]
+    x_start: int
+    y_start: int
+
+    # per region (y - y_start, x - x_start) tables
+    present: np.ndarray
+    height_min: np.ndarray
+    height_max: np.ndarray
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+        self.heights = np.load(path / HEIGHTS_FILE, mmap_mode="r")
+
+        with np.load(path / INDEX_FILE) as index:
+            self.x_start, self.y_start = (int(v) for v in index["origin"])
+            self.present = index["present"]
+            self.height_min = index["height_min"]
+            self.height_max = index["height_max"]
+
+    @property
+    def x_size(self) -> int:
+        return self.present.shape[1]
+
+    @property
+    def y_size(self) -> int:
+        return self.present.shape[0]
+
+    def contains(self, x: int, y: int) -> bool:
+        col, row = x - self.x_start, y - self.y_start
+
+        if not (0 <= col < self.x_size and 0 <= row < self.y_size):
+            return False
+
+        return bool(self.present[row, col])
+
+    def region(self, x: int, y: int) -> np.ndarray:
+        if not self.contains(x, y):
+            raise KeyError("region not in atlas", (x, y))
+
+        row = (y - self.y_start) * REGION_STEP
+        col = (x - self.x_start) * REGION_STEP
+
+        return self.heights[row : row + REGION_VERTICES, col : col + REGION_VERTICES]
+
+    def height_range(self, x: int, y: int) -> tuple[float, float]:
+        if not self.contains(x, y):
+            raise KeyError("region not in atlas", (x, y))
+
+        row, col = y - self.y_start, x - self.x_start
+
+        return float(self.height_min[row, col]), float(self.height_max[row, col])
+
+
+def build_height_atlas(map_path: Path, output_path: Path) -> HeightAtlas:
+    start = perf_counter()
+
+    regions = scan_regions(map_path)
+
+    if len(regions) == 0:
+        raise FileNotFoundError(
+            "no .m files found! make sure the map_path points to the MAP data folder"
+        )
+
+    xs = [x for x, _, _ in regions]
+    ys = [y for _, y, _ in regions]
+
+    x_start, y_start = min(xs), min(ys)
+    x_size = max(xs) - x_start + 1
+    y_size = max(ys) - y_start + 1
+
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    heights = np.lib.format.open_memmap(
+        output_path / HEIGHTS_FILE,
+        mode="w+",
+        dtype=np.float32,
+        shape=(y_size * REGION_STEP + 1, x_size * REGION_STEP + 1),
+    )
+    heights[:] = np.nan
+
+    present = np.zeros((y_size, x_size), dtype=bool)
+    height_min = np.full((y_size, x_size), np.nan, dtype=np.float32)
+    height_max = np.full((y_size, x_size), np.nan, dtype=np.float32)
+
+    for x, y, m_path in regions:
+        try:
+            region_heights = read_region_heights(m_path)
+        except ValueError as e:
+            log.warning("skipping %s: %s", m_path, e)
+            continue
+
+        row, col = y - y_start, x - x_start
+
+        # neighbouring regions share their border vertices
+        heights[
+            row * REGION_STEP : row * REGION_STEP + REGION_VERTICES,
+            col * REGION_STEP : col * REGION_STEP + REGION_VERTICES,
+        ] = region_heights
+
+        present[row, col] = True
+        height_min[row, col] = region_heights.min()
+        height_max[row, col] = region_heights.max()
+
+    heights.flush()
+    del heights
+
+    np.savez(
+        output_path / INDEX_FILE,
+        origin=np.array([x_start, y_start], dtype=np.int32),
+        present=present,
+        height_min=height_min,
+        height_max=height_max,
+    )
+
+    log.info(
+        "%d regions written to %s in %.2fs",
+        int(present.sum()),
+        output_path,
+        perf_counter() - start,
+    )
+
+    return HeightAtlas(output_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="build the world height atlas")
+    parser.add_argument("map_path", type=Path, help="SRO Map folder")
+    parser.add_argument("output_path", type=Path, help="atlas output folder")
+
+    args = parser.parse_args()
+
+    start = perf_counter()
+    atlas = build_height_atlas(args.map_path, args.output_path)
+
+    print(
+        f"[ HeightAtlas ] {int(atlas.present.sum())} regions written to "
+        f"{args.output_path} in {perf_counter() - start:.2f}s"
+    )
@@ -0,0 +1,95 @@
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from time import perf_counter
+
+
+# span names start with one of these, "read.bsr", "build.terrain", ...
+STAGES = ("read", "decode", "convert", "build", "link")
+
+
+def stage_order(name: str) -> tuple[int, str]:
+    stage = name.split(".")[0]
+    return (STAGES.index(stage) if stage in STAGES else len(STAGES), name)
+
+
+@dataclass
+class Span:
+    seconds: float = 0.0
+    calls: int = 0
+
+
+@dataclass
+class Stats:
+    # accumulated until reset, usually once per operator run
+    spans: dict[str, Span] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+
+    def reset(self):
+        self.spans = {}
+        self.counters = {}
+
+    @contextmanager
+    def span(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            span = self.spans.get(name)
+            if span is None:
+                span = self.spans[name] = Span()
+
+            span.seconds += perf_counter() - start
+            span.calls += 1
+
+    def timed(self, name: str):
+        # span around every call of the decorated function
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def stage_seconds(self) -> dict[str, float]:
+        # spans of the same kind summed, nested spans are counted in both
+        totals: dict[str, float] = {}
+        for name, span in self.spans.items():
+            stage = name.split(".")[0]
+            totals[stage] = totals.get(stage, 0.0) + span.seconds
+
+        return totals
+
+    def summary(self) -> str:
+        lines = []
+
+        for name in sorted(self.spans, key=stage_order):
+            span = self.spans[name]
+            lines.append(f"{name:<20} {span.seconds:>9.3f}s {span.calls:>8} calls")
+
+        for name in sorted(self.counters):
+            lines.append(f"{name:<20} {self.counters[name]:>10}")
+
+        return "\n".join(lines)
+
+
+stats = Stats()
+
+
+def configure_logging(logger_name: str, level: str):
+    # silent (warnings only) unless the addon preferences ask for more
+    logger = logging.getLogger(logger_name)
+    logger.setLevel(level)
+
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("[ %(module)s ] %(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
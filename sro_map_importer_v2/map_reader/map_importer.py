@@ -1,21 +1,30 @@
 import bpy
 from mathutils import Vector
 from pathlib import Path
+from typing import cast
+
+import numpy as np
 
 from .bsr import BSRReader, BSRData
-from .ofile import MapBlock
 from .object_list import read_object_list
 from .bmt import BMT, BMTMaterial
-from .ofile import OReader, O2Reader
-from .bms import load_bms, import_bms
+from .ofile import PLACEMENT_DTYPE, read_placements, region_id
+from .placements import (
+    PlacementRegistry,
+    batch_collection_name,
+    collection_name,
+    key_from_collection_name,
+)
+from .transforms import flatten_for_blender, placement_matrices
+from .spatial_index import aabb_in_frustum
+from .static_batch import StaticBatch, mesh_arrays
+from .bms import load_bms, import_bms, import_bms_navmesh
 
 from .ddj import DDJTextureReader
+from .instrument import stats
 from .node_tool import NodeTool
 
 
-SCALE = Vector([0.003125, 0.003125, 0.003125])
-
-
 class BMTImporter(BMT):
     def __init__(self, data_path: Path) -> None:
         super().__init__()
@@ -38,9 +47,13 @@ class BMTImporter(BMT):
         if not diffuse_path.exists():
             raise Exception("diffuse path does not exist", diffuse_path)
 
-        dds_path = DDJTextureReader.convert_ddj_to_dds(diffuse_path)
+        with stats.span("convert.ddj"):
+            dds_path = DDJTextureReader.convert_ddj_to_dds(diffuse_path)
 
-        image = bpy.data.images.load(filepath=dds_path.as_posix(), check_existing=True)
+        with stats.span("read.image"):
+            image = bpy.data.images.load(
+                filepath=dds_path.as_posix(), check_existing=True
+            )
 
         m = bpy.data.materials.new(material.name)
         m.use_nodes = True
@@ -52,6 +65,20 @@ class BMTImporter(BMT):
         NodeTool.add_nodes(ntree, image, material.has_alpha)
 
 
+# custom property holding the object.ifo id a proxy stands in for
+PROXY_PROPERTY = "sro_proxy_ob_id"
+
+
+def proxy_region(proxy_ob: bpy.types.Object) -> int | None:
+    # region id of the placement collection holding the proxy
+    for collection in proxy_ob.users_collection:
+        key = key_from_collection_name(collection.name)
+        if key is not None:
+            return key >> 16
+
+    return None
+
+
 class BoundingBox:
     def __init__(self, dimensions: Vector, minimum: Vector, maximum: Vector):
         self.dimensions = dimensions
@@ -82,6 +109,41 @@ class BoundingBox:
         return data
 
 
+def camera_frustum_planes(
+    camera: bpy.types.Object, scene: bpy.types.Scene, margin: float = 0.0
+) -> np.ndarray:
+    # (6, 4) inward facing planes, a*x + b*y + c*z + d >= 0 inside, pushed out by margin
+    data = cast(bpy.types.Camera, camera.data)
+    frame = [Vector(corner) for corner in data.view_frame(scene=scene)]
+
+    near, far = data.clip_start, data.clip_end
+
+    corners: list[Vector] = []
+    for distance in (near, far):
+        for corner in frame:
+            if data.type == "ORTHO":
+                local = Vector((corner.x, corner.y, -distance))
+            else:
+                local = corner * (distance / -corner.z)
+            corners.append(camera.matrix_world @ local)
+
+    center = sum(corners, Vector()) / len(corners)
+
+    # near, far and the four sides, each as three corners of the frustum box
+    faces = [(0, 1, 2), (4, 5, 6), (0, 1, 5), (1, 2, 6), (2, 3, 7), (3, 0, 4)]
+
+    planes = np.zeros((len(faces), 4), dtype=np.float64)
+    for idx, (a, b, c) in enumerate(faces):
+        normal = (corners[b] - corners[a]).cross(corners[c] - corners[a]).normalized()
+        if normal.dot(center - corners[a]) < 0:
+            normal = -normal
+
+        planes[idx, :3] = normal
+        planes[idx, 3] = -normal.dot(corners[a]) + margin
+
+    return planes
+
+
 def map_range(
     from_range: tuple[float, float], to_range: tuple[float, float], value: float
 ):
@@ -103,6 +165,33 @@ class MapObjectsImporter:
     imported_materials: set[str]
     bsr_cache: dict[str, BSRData]
     mesh_cache: dict[str, dict]
+    # bms path to (vertices, faces, uvs, material) for static batching
+    array_cache: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray, str]]
+
+    # region the level of detail is measured from, None imports every lod
+    lod_focus: tuple[int, int] | None
+    # region distances up to which all lods / only lod 0 are imported,
+    # beyond lod_far only big lod 0 objects are kept
+    lod_near: int
+    lod_far: int
+
+    # placements imported so far, replaces per placement collection lookups
+    registry: PlacementRegistry
+
+    # place bounding boxes instead of reading bms / bmt / ddj
+    proxy: bool
+    # merge each region into one mesh per material instead of placing objects
+    static_batch: bool
+    # also place the bms navmesh collision meshes
+    navmesh: bool
+
+    # (K, 4) inward facing world space planes, placements outside are skipped
+    cull_planes: np.ndarray | None
+    culled: int
+
+    # region being imported and its placed objects waiting for their matrices
+    placements: np.ndarray
+    pending: list[tuple[bpy.types.Object, int]]
 
     def __init__(self, data_path: Path, map_path: Path) -> None:
         self.DATA_PATH = data_path
@@ -112,10 +201,27 @@ class MapObjectsImporter:
         self.imported_materials = set()
         self.bsr_cache = {}
         self.mesh_cache = {}
+        self.array_cache = {}
 
         self.x_offset = 0
         self.y_offset = 0
 
+        self.lod_focus = None
+        self.lod_near = 1
+        self.lod_far = 3
+
+        self.registry = PlacementRegistry()
+
+        self.proxy = False
+        self.static_batch = False
+        self.navmesh = False
+
+        self.cull_planes = None
+        self.culled = 0
+
+        self.placements = np.empty(0, dtype=PLACEMENT_DTYPE)
+        self.pending = []
+
         self.resources = read_object_list(self.OBJECT_LIST)
         self.bsr = BSRReader()
         self.bmt = BMTImporter(self.DATA_PATH)
@@ -125,123 +231,367 @@ class MapObjectsImporter:
             bmt_path = self.DATA_PATH / material.name
 
             if bmt_path.as_posix() in self.imported_materials:
+                stats.count("cache_hits")
                 continue
 
             if not bmt_path.exists():
                 raise Exception("not exists", bmt_path)
 
-            self.bmt.read(bmt_path)
+            with stats.span("read.bmt"):
+                self.bmt.read(bmt_path)
+
+            stats.count("files")
+            stats.count("cache_misses")
 
-            for material in self.bmt.materials:
-                self.bmt.import_material(material)
+            with stats.span("build.material"):
+                for material in self.bmt.materials:
+                    self.bmt.import_material(material)
 
             self.imported_materials.add(bmt_path.as_posix())
 
-    def import_map_blocks_materials(self, map_blocks: list[MapBlock]):
-        for map_block in map_blocks:
-            for lod in map_block.lods:
-                if len(lod) == 0:
-                    continue
+    def read_resource(self, ob_id: int) -> BSRData | None:
+        resource = self.resources[ob_id]
+        resource_path = self.DATA_PATH / resource
+
+        data = self.bsr_cache.get(resource_path.as_posix())
+
+        if data is None:
+            if not resource_path.exists():
+                raise Exception("resource path not found", resource_path)
+
+            with stats.span("read.bsr"):
+                data = self.bsr.read(resource_path)
+
+            stats.count("files")
+            stats.count("cache_misses")
 
-                for map_ob in lod:
-                    print("-" * 12)
-                    print(map_ob)
+            if data is None:
+                return None
+            self.bsr_cache[resource_path.as_posix()] = data
+        else:
+            stats.count("cache_hits")
 
-                    resource = self.resources[map_ob.ob_id]
-                    resource_path = self.DATA_PATH / resource
+        return data
 
-                    data = self.bsr_cache.get(resource_path.as_posix())
+    def placement_bounds(self, placements: np.ndarray):
+        # world space boxes of the bsr bounding boxes, in blender coordinates
+        local = np.zeros((len(placements), 6), dtype=np.float32)
 
-                    if data is None:
-                        if not resource_path.exists():
-                            raise Exception("resource path not found", resource_path)
+        for ob_id in np.unique(placements["ob_id"]).tolist():
+            data = self.read_resource(ob_id)
+            if data is None or data.bbox is None:
+                continue
+            local[placements["ob_id"] == ob_id] = data.bbox.bbox
 
-                        data = self.bsr.read(resource_path)
-                        if data is None:
-                            continue
-                        self.bsr_cache[resource_path.as_posix()] = data
+        # bsr boxes are y up like the meshes, swap to blender z up
+        local_min = local[:, [0, 2, 1]]
+        local_max = local[:, [3, 5, 4]]
 
-                    self.import_materials(data)
+        corners = np.stack(
+            [np.where([i & 1, i & 2, i & 4], local_max, local_min) for i in range(8)],
+            axis=1,
+        )
 
-                    if bpy.data.collections.get(
-                        f"{self.x_offset}-{self.y_offset}-{map_ob.uid}"
-                    ):
-                        continue
+        matrices = placement_matrices(placements, self.x_offset, self.y_offset)
+        rotation = matrices[:, :3, :3]
+        translation = matrices[:, None, :3, 3]
 
-                    obs: list[bpy.types.Object] = []
-                    for mesh in data.meshes:
-                        mesh_path = self.DATA_PATH / mesh.name
+        world = np.einsum("nij,nkj->nki", rotation, corners) + translation
 
-                        if mesh_path.as_posix() in self.mesh_cache:
-                            imported_bms_data = self.mesh_cache[mesh_path.as_posix()]
-                        else:
-                            if not mesh_path.exists():
-                                raise Exception("not exists", mesh_path)
+        return world.min(axis=1), world.max(axis=1)
 
-                            imported_bms_data = load_bms(mesh_path)
-                            self.mesh_cache[mesh_path.as_posix()] = imported_bms_data
+    def cull_placements(self, placements: np.ndarray) -> np.ndarray:
+        if self.cull_planes is None or len(placements) == 0:
+            return placements
 
-                        imported_ob = import_bms(mesh_path, imported_bms_data)
-                        obs.append(imported_ob)
+        mins, maxs = self.placement_bounds(placements)
+        visible = aabb_in_frustum(mins, maxs, self.cull_planes)
 
-                    for ob in obs:
-                        ob.select_set(True)
+        self.culled += len(placements) - int(visible.sum())
 
-                    bpy.ops.object.duplicate(linked=True)
-                    bpy.ops.object.move_to_collection(
-                        collection_index=0,
-                        is_new=True,
-                        new_collection_name=f"{self.x_offset}-{self.y_offset}-{map_ob.uid}",
-                    )
+        return placements[visible]
 
-                    collection = bpy.data.collections.get(
-                        f"{self.x_offset}-{self.y_offset}-{map_ob.uid}"
-                    )
-                    assert collection
+    def read_bms(self, mesh_path: Path) -> dict:
+        data = self.mesh_cache.get(mesh_path.as_posix())
 
-                    x = map_range((0, 1920), (0, 6), map_ob.x)
-                    y = map_range((0, 1920), (0, 6), map_ob.z)
-                    z = map_range((0, 1920), (0, 6), map_ob.y)
+        if data is None:
+            if not mesh_path.exists():
+                raise Exception("not exists", mesh_path)
 
-                    location = Vector([x, y, z])
+            with stats.span("read.bms"):
+                data = load_bms(mesh_path)
 
-                    offset = Vector(
-                        [(self.x_offset * 6) - 0.5, (self.y_offset * 6) - 0.5, 0]
-                    )
+            stats.count("files")
+            stats.count("bytes", mesh_path.stat().st_size)
+            stats.count("cache_misses")
 
-                    location += offset
-                    print("moving to", location)
+            self.mesh_cache[mesh_path.as_posix()] = data
+        else:
+            stats.count("cache_hits")
 
-                    for ob in collection.objects:
-                        ob.location = location
-                        ob.scale = SCALE
-                        ob.rotation_euler.z = map_ob.yaw
+        return data
 
-                    bpy.ops.object.select_all(action="DESELECT")
+    def read_mesh_arrays(self, mesh_path: Path):
+        arrays = self.array_cache.get(mesh_path.as_posix())
 
-    def read_o(self, path: Path):
-        o = OReader()
+        if arrays is None:
+            data = self.read_bms(mesh_path)
+            arrays = (*mesh_arrays(data), data["material"])
+            self.array_cache[mesh_path.as_posix()] = arrays
 
-        self.base_path = path
+        return arrays
 
-        self.x_offset = int(path.stem)
-        self.y_offset = int(path.parent.stem)
+    def resource_objects(self, data: BSRData) -> list[bpy.types.Object]:
+        # source objects in bms_import, placements are linked copies of these
+        self.import_materials(data)
 
-        o.read(self.base_path.with_suffix(".o"))
+        obs: list[bpy.types.Object] = []
+        for mesh in data.meshes:
+            mesh_path = self.DATA_PATH / mesh.name
 
-        self.import_map_blocks_materials(o.map_blocks)
+            bms_data = self.read_bms(mesh_path)
 
-    def read_o2(self, path: Path):
-        o = O2Reader()
+            with stats.span("build.bms"):
+                imported_ob = import_bms(mesh_path, bms_data)
+            imported_ob.select_set(False)
+            obs.append(imported_ob)
+
+            if self.navmesh:
+                nav_ob = import_bms_navmesh(f"{imported_ob.name}.NavMesh", bms_data)
+                if nav_ob is not None:
+                    obs.append(nav_ob)
+
+        return obs
+
+    @staticmethod
+    def proxy_mesh(ob_id: int, data: BSRData) -> bpy.types.Mesh:
+        name = f"proxy {ob_id}"
+
+        mesh = bpy.data.meshes.get(name)
+        if mesh is not None:
+            return mesh
+
+        bbox = data.bbox.bbox if data.bbox is not None else (0, 0, 0, 0, 0, 0)
+        # bsr boxes are y up like the meshes, swap to blender z up
+        min_x, min_z, min_y, max_x, max_z, max_y = bbox
+
+        vertices = [
+            (x, y, z)
+            for z in (min_z, max_z)
+            for y in (min_y, max_y)
+            for x in (min_x, max_x)
+        ]
+        faces = [
+            (0, 2, 3, 1),
+            (4, 5, 7, 6),
+            (0, 1, 5, 4),
+            (2, 6, 7, 3),
+            (0, 4, 6, 2),
+            (1, 3, 7, 5),
+        ]
+
+        mesh = bpy.data.meshes.new(name)
+        mesh.from_pydata(vertices, [], faces)
+
+        return mesh
+
+    def import_placement(self, idx: int):
+        placement = self.placements[idx]
+        ob_id = int(placement["ob_id"])
+
+        data = self.read_resource(ob_id)
+        if data is None:
+            return
+
+        stats.count("placements")
+
+        # named after the owning region, so the same object shared by neighbours matches
+        name = collection_name(int(placement["region_id"]), int(placement["uid"]))
+
+        collection = bpy.data.collections.new(name)
+        context = bpy.context
+        assert context
+        context.scene.collection.children.link(collection)
+
+        if self.proxy:
+            # stands in for the real geometry until resolve_proxies swaps it
+            proxy_ob = bpy.data.objects.new(name, self.proxy_mesh(ob_id, data))
+            proxy_ob.display_type = "WIRE"
+            proxy_ob[PROXY_PROPERTY] = ob_id
+            collection.objects.link(proxy_ob)
+            self.pending.append((proxy_ob, idx))
+            return
+
+        for ob in self.resource_objects(data):
+            # linked duplicate, the mesh data is shared with the bms_import object
+            placed_ob = ob.copy()
+            collection.objects.link(placed_ob)
+            self.pending.append((placed_ob, idx))
+
+    def resolve_proxies(self, proxies: list[bpy.types.Object]) -> int:
+        resolved = 0
+
+        for proxy_ob in proxies:
+            ob_id = proxy_ob.get(PROXY_PROPERTY)
+            if ob_id is None:
+                continue
+
+            data = self.read_resource(int(ob_id))
+            if data is None:
+                continue
+
+            for ob in self.resource_objects(data):
+                placed_ob = ob.copy()
+                placed_ob.matrix_world = proxy_ob.matrix_world
+
+                for collection in proxy_ob.users_collection:
+                    collection.objects.link(placed_ob)
+
+            bpy.data.objects.remove(proxy_ob)
+            resolved += 1
+
+        return resolved
+
+    def begin_region(self, path: Path, suffix: str | None = None) -> int:
+        self.placements = self.load_region(path, suffix)
+        self.pending = []
+
+        return len(self.placements)
+
+    @stats.timed("link.placements")
+    def finish_region(self):
+        if not self.pending:
+            return
+
+        matrices = placement_matrices(self.placements, self.x_offset, self.y_offset)
+        rows = np.array([idx for _, idx in self.pending], dtype=np.intp)
+
+        # one foreach_set for the whole region through a temporary collection
+        staging = bpy.data.collections.new("sro_staging")
+        for ob, _ in self.pending:
+            staging.objects.link(ob)
+
+        staging.objects.foreach_set("matrix_world", flatten_for_blender(matrices[rows]))
+
+        bpy.data.collections.remove(staging)
+        self.pending = []
+
+    def select_placements(self, placements: np.ndarray) -> np.ndarray:
+        if self.lod_focus is None:
+            return placements
+
+        focus_x, focus_y = self.lod_focus
+        distance = max(abs(self.x_offset - focus_x), abs(self.y_offset - focus_y))
+
+        if distance <= self.lod_near:
+            return placements
+
+        # lod 0 is the first of the four lists of every block
+        base = placements["lod"] == 0
+
+        if distance <= self.lod_far:
+            return placements[base]
+
+        return placements[base & placements["is_big"]]
+
+    def reset_registry(self):
+        # placements already in the file count as imported
+        self.registry = PlacementRegistry()
+        self.registry.add_collection_names(c.name for c in bpy.data.collections)
+        self.culled = 0
+
+    def stats(self) -> str:
+        text = self.registry.stats()
+
+        if self.cull_planes is not None:
+            text += f", {self.culled} outside the camera"
+
+        return text
+
+    def load_region(self, path: Path, suffix: str | None = None) -> np.ndarray:
+        if suffix is None:
+            suffix = ".o2" if path.with_suffix(".o2").exists() else ".o"
 
         self.base_path = path
 
         self.x_offset = int(path.stem)
         self.y_offset = int(path.parent.stem)
 
-        o.read(self.base_path.with_suffix(".o2"))
+        o_path = self.base_path.with_suffix(suffix)
+
+        with stats.span(f"read{suffix}"):
+            placements = read_placements(
+                o_path, region_id(self.x_offset, self.y_offset)
+            )
+
+        stats.count("files")
+        stats.count("bytes", o_path.stat().st_size)
+        placements = self.select_placements(placements)
+        placements = self.cull_placements(placements)
+
+        return self.registry.filter(placements)
+
+    def batch_region(self, path: Path, suffix: str | None = None):
+        # the registry only knows placement collections, a batched region is
+        # recognised by its batch collection instead
+        x, y = int(path.stem), int(path.parent.stem)
+        if bpy.data.collections.get(batch_collection_name(x, y)) is not None:
+            return
+
+        placements = self.load_region(path, suffix)
+
+        with stats.span("decode.matrices"):
+            matrices = placement_matrices(placements, self.x_offset, self.y_offset)
+
+        stats.count("placements", len(placements))
+
+        batch = StaticBatch()
+
+        # every resource is transformed for all of its placements at once
+        for ob_id in np.unique(placements["ob_id"]).tolist():
+            data = self.read_resource(ob_id)
+            if data is None:
+                continue
+
+            self.import_materials(data)
 
-        self.import_map_blocks_materials(o.map_blocks)
+            rows = placements["ob_id"] == ob_id
+            for mesh in data.meshes:
+                vertices, faces, uvs, material = self.read_mesh_arrays(
+                    self.DATA_PATH / mesh.name
+                )
+                batch.add(material, vertices, faces, uvs, matrices[rows])
+
+        prefix = f"{self.x_offset}-{self.y_offset}"
+
+        collection = bpy.data.collections.new(batch_collection_name(x, y))
+        context = bpy.context
+        assert context
+        context.scene.collection.children.link(collection)
+
+        with stats.span("build.batch"):
+            obs = batch.build(prefix)
+
+        stats.count("batched_objects", len(obs))
+
+        for ob in obs:
+            collection.objects.link(ob)
+
+    def import_region(self, path: Path, suffix: str | None = None):
+        if self.static_batch:
+            self.batch_region(path, suffix)
+            return
+
+        for idx in range(self.begin_region(path, suffix)):
+            self.import_placement(idx)
+
+        self.finish_region()
+
+    def read_o(self, path: Path):
+        self.import_region(path, ".o")
+
+    def read_o2(self, path: Path):
+        self.import_region(path, ".o2")
 
 
 if __name__ == "__main__":
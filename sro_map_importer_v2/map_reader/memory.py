@@ -0,0 +1,93 @@
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+def deep_size(value, seen: set[int] | None = None) -> int:
+    # approximate bytes held by value and everything it references, shared
+    # objects and array buffers are counted once
+    if seen is None:
+        seen = set()
+
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, np.ndarray):
+        # owning arrays include their buffer, views keep their base alive
+        size = sys.getsizeof(value)
+        if value.base is not None:
+            size += deep_size(value.base, seen)
+
+        return size
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return size
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += deep_size(key, seen) + deep_size(item, seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += deep_size(item, seen)
+    elif hasattr(value, "__dict__"):
+        size += deep_size(vars(value), seen)
+
+    return size
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+    return f"{size:.1f} GB"
+
+
+@dataclass
+class MemoryTracker:
+    # tracemalloc between start and stop, plus whatever the importer adds per region
+    frames: int = 1
+    regions: list[tuple[str, dict[str, int]]] = field(default_factory=list)
+
+    snapshot: tracemalloc.Snapshot | None = None
+    started_tracing: bool = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.started_tracing = True
+
+        tracemalloc.reset_peak()
+        self.snapshot = tracemalloc.take_snapshot()
+
+    def stop(self, top: int = 10) -> tuple[int, list[tracemalloc.StatisticDiff]]:
+        # peak traced bytes and the source files that grew the most since start
+        _, peak = tracemalloc.get_traced_memory()
+
+        diff: list[tracemalloc.StatisticDiff] = []
+        if self.snapshot is not None:
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]
+            )
+            diff = snapshot.compare_to(self.snapshot, "filename")[:top]
+
+        self.discard()
+
+        return peak, diff
+
+    def discard(self):
+        # stops tracing without a report, for runs that end early
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+        self.snapshot = None
+
+    def add_region(self, name: str, delta: dict[str, int]):
+        self.regions.append((name, delta))
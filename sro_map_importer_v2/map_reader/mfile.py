@@ -0,0 +1,183 @@
+import argparse
+import logging
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+
+log = logging.getLogger(__name__)
+
+
+M_HEADER_SIZE = 12
+
+BLOCKS_PER_SIDE = 6
+BLOCK_COUNT = BLOCKS_PER_SIDE * BLOCKS_PER_SIDE
+
+# every block has 17 * 17 vertices, neighbouring blocks share their edge vertices
+BLOCK_VERTICES = 17
+BLOCK_TILES = 16
+REGION_VERTICES = BLOCKS_PER_SIDE * BLOCK_TILES + 1
+
+# size of a region side in .o2 / .nvm units
+REGION_SIZE = 1920.0
+TILE_SIZE = REGION_SIZE / (BLOCKS_PER_SIDE * BLOCK_TILES)
+
+MAP_VERTEX_DTYPE = np.dtype(
+    [
+        ("height", "<f4"),
+        ("texture_data", "<u2"),
+        ("brightness", "u1"),
+    ]
+)
+
+# mirrors hexpat/JMXVMAPM.hexpat
+MAP_BLOCK_DTYPE = np.dtype(
+    [
+        ("flag", "<u4"),
+        ("environment_id", "<u2"),
+        ("vertices", MAP_VERTEX_DTYPE, (BLOCK_VERTICES * BLOCK_VERTICES,)),
+        ("water_type", "u1"),
+        ("water_wave_type", "u1"),
+        ("water_height", "<f4"),
+        ("tile_map", "<u2", (BLOCK_TILES * BLOCK_TILES,)),
+        ("height_max", "<f4"),
+        ("height_min", "<f4"),
+        ("reserved", "u1", (20,)),
+    ]
+)
+
+# fields of MAP_BLOCK_DTYPE kept by the header scan
+BLOCK_HEADER_FIELDS = (
+    "flag",
+    "environment_id",
+    "water_type",
+    "water_wave_type",
+    "water_height",
+    "height_max",
+    "height_min",
+)
+
+BLOCK_HEADER_RAW_DTYPE = np.dtype(
+    [(name, MAP_BLOCK_DTYPE.fields[name][0]) for name in BLOCK_HEADER_FIELDS]
+)
+
+BLOCK_HEADER_DTYPE = np.dtype(
+    [
+        ("x", "<u2"),
+        ("y", "<u2"),
+        ("block", "u1"),
+        *BLOCK_HEADER_RAW_DTYPE.descr,
+    ]
+)
+
+
+def region_path(map_path: Path, x: int, y: int, suffix: str = ".m") -> Path:
+    return map_path / str(y) / (str(x) + suffix)
+
+
+def read_map_blocks(path: Path) -> np.ndarray:
+    blocks = np.fromfile(
+        path, dtype=MAP_BLOCK_DTYPE, count=BLOCK_COUNT, offset=M_HEADER_SIZE
+    )
+
+    if len(blocks) != BLOCK_COUNT:
+        raise ValueError("truncated .m file", path)
+
+    return blocks
+
+
+def region_heights(blocks: np.ndarray) -> np.ndarray:
+    # block i sits at column i % 6, row i // 6 and its vertices are stored row by row,
+    # the same layout import_map relies on when filling the grid attributes
+    heights = np.empty((REGION_VERTICES, REGION_VERTICES), dtype=np.float32)
+
+    block_heights = blocks["vertices"]["height"].reshape(
+        BLOCK_COUNT, BLOCK_VERTICES, BLOCK_VERTICES
+    )
+
+    for idx in range(BLOCK_COUNT):
+        row = (idx // BLOCKS_PER_SIDE) * BLOCK_TILES
+        col = (idx % BLOCKS_PER_SIDE) * BLOCK_TILES
+        heights[row : row + BLOCK_VERTICES, col : col + BLOCK_VERTICES] = (
+            block_heights[idx]
+        )
+
+    return heights
+
+
+def read_region_heights(path: Path) -> np.ndarray:
+    return region_heights(read_map_blocks(path))
+
+
+def scan_regions(map_path: Path) -> list[tuple[int, int, Path]]:
+    regions: list[tuple[int, int, Path]] = []
+
+    for y_dir in map_path.iterdir():
+        if not y_dir.is_dir() or not y_dir.name.isdigit():
+            continue
+
+        for m_path in y_dir.glob("*.m"):
+            if not m_path.stem.isdigit():
+                continue
+
+            regions.append((int(m_path.stem), int(y_dir.name), m_path))
+
+    regions.sort(key=lambda region: (region[1], region[0]))
+
+    return regions
+
+
+def read_block_headers(path: Path) -> np.ndarray:
+    # blocks are ~2.5 KB apart, seeking to the fields reads the same pages, a single
+    # fromfile of the whole region is ~3x faster than seeking per block
+    blocks = read_map_blocks(path)
+
+    headers = np.empty(BLOCK_COUNT, dtype=BLOCK_HEADER_RAW_DTYPE)
+    for name in BLOCK_HEADER_RAW_DTYPE.names:
+        headers[name] = blocks[name]
+
+    return headers
+
+
+def scan_block_headers(map_path: Path) -> np.ndarray:
+    regions = scan_regions(map_path)
+
+    table = np.zeros(len(regions) * BLOCK_COUNT, dtype=BLOCK_HEADER_DTYPE)
+
+    count = 0
+    for x, y, m_path in regions:
+        try:
+            headers = read_block_headers(m_path)
+        except ValueError as e:
+            log.warning("skipping %s: %s", m_path, e)
+            continue
+
+        rows = table[count : count + BLOCK_COUNT]
+        rows["x"] = x
+        rows["y"] = y
+        rows["block"] = np.arange(BLOCK_COUNT)
+
+        for name in BLOCK_HEADER_RAW_DTYPE.names:
+            rows[name] = headers[name]
+
+        count += BLOCK_COUNT
+
+    return table[:count]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="scan every .m block header")
+    parser.add_argument("map_path", type=Path, help="SRO Map folder")
+    parser.add_argument("output_path", type=Path, help="output .npy table")
+
+    args = parser.parse_args()
+
+    start = perf_counter()
+    block_headers = scan_block_headers(args.map_path)
+    np.save(args.output_path, block_headers)
+
+    print(
+        f"[ BlockHeaders ] {len(block_headers)} blocks written to {args.output_path} "
+        f"in {perf_counter() - start:.2f}s"
+    )
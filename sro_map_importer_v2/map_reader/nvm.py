@@ -0,0 +1,263 @@
+"""
+JMXVNVM 1000 navmesh reader, see ref/JellyNVM.py for the layout
+
+usage (from the sro_map_importer_v2 folder, no blender required):
+    python -m map_reader.nvm <navmesh folder or .nvm file>
+"""
+
+import argparse
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+from .mfile import REGION_VERTICES
+
+
+NVM_SIGNATURE = b"JMXVNVM 1000"
+
+# same fields as an .o2 placement, followed by the linked edge count
+NVM_OBJECT_DTYPE = np.dtype(
+    [
+        ("ob_id", "<u4"),
+        ("x", "<f4"),
+        ("y", "<f4"),
+        ("z", "<f4"),
+        ("is_static", "<u2"),
+        ("yaw", "<f4"),
+        ("uid", "<u2"),
+        ("short", "<u2"),
+        ("is_big", "?"),
+        ("is_struct", "?"),
+        ("region_id", "<u2"),
+        ("link_count", "<u2"),
+    ]
+)
+# every object is followed by link_count of these
+NVM_OBJECT_LINK_SIZE = 6
+
+# axis aligned quad in region units, x / z, followed by a u8 count of u16 objects
+NVM_CELL_DTYPE = np.dtype(
+    [
+        ("min", "<f4", (2,)),
+        ("max", "<f4", (2,)),
+        ("object_count", "u1"),
+    ]
+)
+
+NVM_INTERNAL_EDGE_DTYPE = np.dtype(
+    [
+        ("a", "<f4", (2,)),
+        ("b", "<f4", (2,)),
+        ("flag", "u1"),
+        ("src_direction", "u1"),
+        ("dst_direction", "u1"),
+        ("src_cell", "<u2"),
+        ("dst_cell", "<u2"),
+    ]
+)
+# edges on the region border also name the regions on both sides
+NVM_GLOBAL_EDGE_DTYPE = np.dtype(
+    NVM_INTERNAL_EDGE_DTYPE.descr + [("src_region", "<u2"), ("dst_region", "<u2")]
+)
+
+NVM_TILES = REGION_VERTICES - 1
+
+NVM_TILE_DTYPE = np.dtype(
+    [
+        ("cell", "<u4"),
+        ("flag", "<u2"),
+        ("texture_id", "<u2"),
+    ]
+)
+
+
+@dataclass
+class NVMData:
+    objects: np.ndarray
+    # object i links object_links[object_link_offsets[i] : object_link_offsets[i + 1]]
+    object_links: np.ndarray
+    object_link_offsets: np.ndarray
+
+    cells: np.ndarray
+    walkable_cell_count: int
+    # cell i holds cell_objects[cell_object_offsets[i] : cell_object_offsets[i + 1]]
+    cell_objects: np.ndarray
+    cell_object_offsets: np.ndarray
+
+    global_edges: np.ndarray
+    internal_edges: np.ndarray
+
+    # (96, 96) rows are z, columns are x
+    tiles: np.ndarray
+    # (97, 97) heights, same layout as the .m region heights
+    heights: np.ndarray
+
+
+def nvm_path(navmesh_path: Path, x: int, y: int) -> Path:
+    return navmesh_path / f"nv_{y:02x}{x:02x}.nvm"
+
+
+def region_from_nvm_path(path: Path) -> tuple[int, int] | None:
+    # nv_{y:02x}{x:02x}.nvm
+    name = path.stem
+    if not name.startswith("nv_") or len(name) != 7:
+        return None
+
+    try:
+        return int(name[5:7], 16), int(name[3:5], 16)
+    except ValueError:
+        return None
+
+
+def gather_records(buffer: np.ndarray, offsets: np.ndarray, dtype: np.dtype):
+    # records of dtype starting at every offset
+    rows = buffer[offsets[:, None] + np.arange(dtype.itemsize)]
+    return np.ascontiguousarray(rows).view(dtype).reshape(-1)
+
+
+def gather_runs(buffer: np.ndarray, starts: np.ndarray, lengths: np.ndarray):
+    # bytes of every [start, start + length) concatenated
+    local = np.arange(int(lengths.sum())) - np.repeat(
+        np.cumsum(lengths) - lengths, lengths
+    )
+    return buffer[np.repeat(starts, lengths) + local]
+
+
+def scan_records(
+    data: bytes,
+    offset: int,
+    count: int,
+    head_size: int,
+    count_format: str,
+    item_size: int,
+) -> tuple[np.ndarray, np.ndarray, int]:
+    # offsets and trailing item counts of records of head_size bytes whose last field
+    # is the count of item_size sized entries following them
+    count_size = struct.calcsize(count_format)
+
+    offsets = np.empty(count, dtype=np.int64)
+    counts = np.empty(count, dtype=np.int64)
+
+    for i in range(count):
+        (items,) = struct.unpack_from(
+            count_format, data, offset + head_size - count_size
+        )
+        offsets[i] = offset
+        counts[i] = items
+        offset += head_size + items * item_size
+
+    return offsets, counts, offset
+
+
+def counts_to_offsets(counts: np.ndarray) -> np.ndarray:
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def read_nvm(path: Path) -> NVMData:
+    data = path.read_bytes()
+
+    if data[: len(NVM_SIGNATURE)] != NVM_SIGNATURE:
+        raise Exception("not a JMXVNVM 1000 file", path)
+
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    offset = len(NVM_SIGNATURE)
+
+    # objects
+    (object_count,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+
+    object_offsets, link_counts, offset = scan_records(
+        data,
+        offset,
+        object_count,
+        NVM_OBJECT_DTYPE.itemsize,
+        "<H",
+        NVM_OBJECT_LINK_SIZE,
+    )
+
+    objects = gather_records(buffer, object_offsets, NVM_OBJECT_DTYPE)
+    object_links = (
+        gather_runs(
+            buffer,
+            object_offsets + NVM_OBJECT_DTYPE.itemsize,
+            link_counts * NVM_OBJECT_LINK_SIZE,
+        )
+        .view("<u2")
+        .reshape(-1, 3)
+    )
+
+    # cells
+    cell_count, walkable_cell_count = struct.unpack_from("<II", data, offset)
+    offset += 8
+
+    cell_offsets, object_counts, offset = scan_records(
+        data, offset, cell_count, NVM_CELL_DTYPE.itemsize, "<B", 2
+    )
+
+    cells = gather_records(buffer, cell_offsets, NVM_CELL_DTYPE)
+    cell_objects = gather_runs(
+        buffer, cell_offsets + NVM_CELL_DTYPE.itemsize, object_counts * 2
+    ).view("<u2")
+
+    # edges
+    edges: list[np.ndarray] = []
+    for dtype in (NVM_GLOBAL_EDGE_DTYPE, NVM_INTERNAL_EDGE_DTYPE):
+        (edge_count,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+
+        edges.append(np.frombuffer(data, dtype, edge_count, offset))
+        offset += edge_count * dtype.itemsize
+
+    # tile map and heightmap
+    tiles = np.frombuffer(data, NVM_TILE_DTYPE, NVM_TILES * NVM_TILES, offset)
+    offset += tiles.nbytes
+
+    heights = np.frombuffer(data, "<f4", REGION_VERTICES * REGION_VERTICES, offset)
+
+    return NVMData(
+        objects=objects,
+        object_links=object_links,
+        object_link_offsets=counts_to_offsets(link_counts),
+        cells=cells,
+        walkable_cell_count=walkable_cell_count,
+        cell_objects=cell_objects,
+        cell_object_offsets=counts_to_offsets(object_counts),
+        global_edges=edges[0],
+        internal_edges=edges[1],
+        tiles=tiles.reshape(NVM_TILES, NVM_TILES),
+        heights=heights.reshape(REGION_VERTICES, REGION_VERTICES),
+    )
+
+
+def scan_nvm(path: Path) -> list[Path]:
+    if path.is_file():
+        return [path]
+
+    return sorted(p for p in path.glob("nv_*.nvm") if region_from_nvm_path(p))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="decode JMXVNVM navmesh files")
+    parser.add_argument("path", type=Path, help="navmesh folder or .nvm file")
+
+    args = parser.parse_args()
+
+    start = perf_counter()
+
+    paths = scan_nvm(args.path)
+    cells = 0
+    edges = 0
+    for nvm in paths:
+        nvm_data = read_nvm(nvm)
+        cells += len(nvm_data.cells)
+        edges += len(nvm_data.global_edges) + len(nvm_data.internal_edges)
+
+    print(
+        f"[ NVM ] {len(paths)} files, {cells} cells, {edges} edges "
+        f"in {perf_counter() - start:.2f}s"
+    )
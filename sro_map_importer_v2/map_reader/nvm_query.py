@@ -0,0 +1,223 @@
+import numpy as np
+
+from .mfile import REGION_SIZE
+from .nvm import NVMData, gather_runs
+
+
+# 48 * 48 buckets per region, two terrain tiles wide
+GRID_CELL_SIZE = REGION_SIZE / 48
+
+# edge flags that stop movement in either direction
+BLOCKING_EDGE_FLAGS = 0x01 | 0x02
+
+
+def grid_csr(mins: np.ndarray, maxs: np.ndarray, cell_size: float, side: int):
+    # (offsets, indices) listing every box under the grid buckets it overlaps
+    c0 = np.clip(np.floor(mins / cell_size).astype(np.int64), 0, side - 1)
+    c1 = np.clip(np.floor(maxs / cell_size).astype(np.int64), 0, side - 1)
+
+    owner, buckets = expand_boxes(c0, c1, side)
+
+    order = np.argsort(buckets, kind="stable")
+
+    offsets = np.zeros(side * side + 1, dtype=np.int64)
+    np.cumsum(np.bincount(buckets, minlength=side * side), out=offsets[1:])
+
+    return offsets, owner[order].astype(np.int32)
+
+
+def expand_boxes(c0: np.ndarray, c1: np.ndarray, side: int):
+    # (box index, bucket) for every bucket of every inclusive (col, row) range
+    widths = c1[:, 0] - c0[:, 0] + 1
+    heights = c1[:, 1] - c0[:, 1] + 1
+    counts = widths * heights
+
+    owner = np.repeat(np.arange(len(c0)), counts)
+    local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    cols = c0[owner, 0] + local % widths[owner]
+    rows = c0[owner, 1] + local // widths[owner]
+
+    return owner, rows * side + cols
+
+
+def orientation(p: np.ndarray, q: np.ndarray, r: np.ndarray) -> np.ndarray:
+    # sign of the turn p -> q -> r, 0 when collinear
+    cross = (q[:, 0] - p[:, 0]) * (r[:, 1] - p[:, 1]) - (q[:, 1] - p[:, 1]) * (
+        r[:, 0] - p[:, 0]
+    )
+    return np.sign(cross)
+
+
+def on_segment(p: np.ndarray, q: np.ndarray, r: np.ndarray) -> np.ndarray:
+    # r inside the box of p q, only meaningful when the three are collinear
+    return (
+        (r[:, 0] >= np.minimum(p[:, 0], q[:, 0]))
+        & (r[:, 0] <= np.maximum(p[:, 0], q[:, 0]))
+        & (r[:, 1] >= np.minimum(p[:, 1], q[:, 1]))
+        & (r[:, 1] <= np.maximum(p[:, 1], q[:, 1]))
+    )
+
+
+def segments_intersect(
+    p1: np.ndarray, p2: np.ndarray, p3: np.ndarray, p4: np.ndarray
+) -> np.ndarray:
+    # vectorized IsLineIntersected from ref/JellyBMS.py
+    o1 = orientation(p1, p2, p4)
+    o2 = orientation(p1, p2, p3)
+    o3 = orientation(p1, p3, p4)
+    o4 = orientation(p2, p3, p4)
+
+    result = (o1 != o2) & (o3 != o4)
+
+    collinear = (o1 == 0) & (o2 == 0) & (o3 == 0) & (o4 == 0)
+    overlap = (
+        on_segment(p1, p2, p3)
+        | on_segment(p1, p2, p4)
+        | on_segment(p3, p4, p1)
+        | on_segment(p3, p4, p2)
+    )
+
+    return np.where(collinear, overlap, result)
+
+
+class NavQuery:
+    # batch queries over one decoded region, positions are region local (x, z)
+    side: int
+
+    cell_offsets: np.ndarray
+    cell_indices: np.ndarray
+
+    # blocking edges only, (E, 2) end points and their flags
+    edge_a: np.ndarray
+    edge_b: np.ndarray
+    edge_flags: np.ndarray
+    edge_offsets: np.ndarray
+    edge_indices: np.ndarray
+
+    def __init__(
+        self,
+        data: NVMData,
+        cell_size: float = GRID_CELL_SIZE,
+        blocking_flags: int = BLOCKING_EDGE_FLAGS,
+    ) -> None:
+        self.data = data
+        self.cell_size = cell_size
+        self.side = int(np.ceil(REGION_SIZE / cell_size))
+
+        self.cell_min = data.cells["min"].astype(np.float64)
+        self.cell_max = data.cells["max"].astype(np.float64)
+
+        self.cell_offsets, self.cell_indices = grid_csr(
+            self.cell_min, self.cell_max, cell_size, self.side
+        )
+
+        edges = [data.global_edges, data.internal_edges]
+        a = np.concatenate([e["a"] for e in edges]).astype(np.float64)
+        b = np.concatenate([e["b"] for e in edges]).astype(np.float64)
+        flags = np.concatenate([e["flag"] for e in edges])
+
+        blocking = (flags & blocking_flags) != 0
+        self.edge_a = a[blocking]
+        self.edge_b = b[blocking]
+        self.edge_flags = flags[blocking]
+
+        self.edge_offsets, self.edge_indices = grid_csr(
+            np.minimum(self.edge_a, self.edge_b),
+            np.maximum(self.edge_a, self.edge_b),
+            cell_size,
+            self.side,
+        )
+
+    def buckets(self, points: np.ndarray) -> np.ndarray:
+        coords = np.clip(
+            np.floor(points / self.cell_size).astype(np.int64), 0, self.side - 1
+        )
+        return coords[:, 1] * self.side + coords[:, 0]
+
+    def cell_at(self, points: np.ndarray) -> np.ndarray:
+        # (N,) nav cell containing every (N, 2) point, -1 outside every cell
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        buckets = self.buckets(points)
+
+        starts = self.cell_offsets[buckets]
+        lengths = self.cell_offsets[buckets + 1] - starts
+
+        candidates = gather_runs(self.cell_indices, starts, lengths)
+        owner = np.repeat(np.arange(len(points)), lengths)
+
+        p = points[owner]
+        inside = np.all(
+            (p >= self.cell_min[candidates]) & (p <= self.cell_max[candidates]),
+            axis=1,
+        )
+
+        result = np.full(len(points), -1, dtype=np.int64)
+
+        # first containing cell, cells sharing an edge both contain its points
+        hit_owner, first = np.unique(owner[inside], return_index=True)
+        result[hit_owner] = candidates[inside][first]
+
+        return result
+
+    def walkable(self, points: np.ndarray) -> np.ndarray:
+        cells = self.cell_at(points)
+        return (cells >= 0) & (cells < self.data.walkable_cell_count)
+
+    def objects_at(self, points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # (point index, nvm object index) pairs for objects of the containing cells
+        cells = self.cell_at(points)
+
+        points_in = np.flatnonzero(cells >= 0)
+        cells_in = cells[points_in]
+
+        starts = self.data.cell_object_offsets[cells_in]
+        lengths = self.data.cell_object_offsets[cells_in + 1] - starts
+
+        objects = gather_runs(self.data.cell_objects, starts, lengths)
+
+        return np.repeat(points_in, lengths), objects.astype(np.int64)
+
+    def segment_crossings(
+        self, starts: np.ndarray, ends: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # (segment index, blocking edge index) pairs of every crossing
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+
+        c0 = np.clip(
+            np.floor(np.minimum(starts, ends) / self.cell_size).astype(np.int64),
+            0,
+            self.side - 1,
+        )
+        c1 = np.clip(
+            np.floor(np.maximum(starts, ends) / self.cell_size).astype(np.int64),
+            0,
+            self.side - 1,
+        )
+
+        segment, buckets = expand_boxes(c0, c1, self.side)
+
+        run_starts = self.edge_offsets[buckets]
+        lengths = self.edge_offsets[buckets + 1] - run_starts
+
+        edges = gather_runs(self.edge_indices, run_starts, lengths)
+        segment = np.repeat(segment, lengths)
+
+        hit = segments_intersect(
+            starts[segment], ends[segment], self.edge_a[edges], self.edge_b[edges]
+        )
+
+        # an edge spanning several buckets is found once per bucket
+        pairs = np.unique(segment[hit].astype(np.int64) << 32 | edges[hit])
+
+        return pairs >> 32, pairs & 0xFFFFFFFF
+
+    def segments_blocked(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        # (N,) True where the straight move crosses a blocking edge
+        blocked = np.zeros(len(np.asarray(starts).reshape(-1, 2)), dtype=bool)
+
+        segment, _ = self.segment_crossings(starts, ends)
+        blocked[segment] = True
+
+        return blocked
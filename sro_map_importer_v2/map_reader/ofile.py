@@ -1,12 +1,38 @@
+import logging
 import struct
 from pathlib import Path
 from io import BufferedReader
 from dataclasses import dataclass
 
+import numpy as np
+
+
+log = logging.getLogger(__name__)
+
 
 OBJ_ID = "<I"
 VECTOR_3 = "<fff"
 
+# packed records, mirror hexpat/JMXVMAPO1001.hexpat and hexpat/o2.hexpat
+O_OBJECT_DTYPE = np.dtype(
+    [
+        ("ob_id", "<u4"),
+        ("x", "<f4"),
+        ("y", "<f4"),
+        ("z", "<f4"),
+        ("is_static", "<u2"),
+        ("yaw", "<f4"),
+        ("uid", "<u2"),
+        ("short", "<u2"),
+        ("is_big", "?"),
+        ("is_struct", "?"),
+    ]
+)
+O2_OBJECT_DTYPE = np.dtype(O_OBJECT_DTYPE.descr + [("region_id", "<u2")])
+
+# one row per placement, region_id is the owning region, (y << 8) | x
+PLACEMENT_DTYPE = np.dtype([("block", "u1"), ("lod", "u1")] + O2_OBJECT_DTYPE.descr)
+
 
 @dataclass
 class MapObject:
@@ -79,7 +105,7 @@ class OReader:
         self.map_blocks.append(m)
 
     def read(self, filepath: Path):
-        print("[ OReader ] reading", filepath)
+        log.debug("reading %s", filepath)
 
         with open(filepath, "rb") as f:
             _header = f.read(12)
@@ -88,8 +114,6 @@ class OReader:
                 for row in range(6):
                     self.read_map_block(f, row, col)
 
-            print("[ OReader ] sucessful read")
-
 
 class O2Reader(OReader):
     def __init__(self) -> None:
@@ -132,6 +156,48 @@ class O2Reader(OReader):
         self.map_blocks.append(m)
 
 
+def region_id(x: int, y: int) -> int:
+    return (y << 8) | x
+
+
+def read_placements(path: Path, own_region_id: int) -> np.ndarray:
+    # .o files carry no region id, their placements belong to the region itself
+    record = O2_OBJECT_DTYPE if path.suffix == ".o2" else O_OBJECT_DTYPE
+
+    data = path.read_bytes()
+    offset = 12
+
+    chunks: list[tuple[int, int, np.ndarray]] = []
+    for block in range(36):
+        for lod in range(4):
+            (count,) = struct.unpack_from("<H", data, offset)
+            offset += 2
+
+            if count == 0:
+                continue
+
+            chunks.append((block, lod, np.frombuffer(data, record, count, offset)))
+            offset += count * record.itemsize
+
+    placements = np.zeros(sum(len(c[2]) for c in chunks), dtype=PLACEMENT_DTYPE)
+
+    start = 0
+    for block, lod, records in chunks:
+        rows = placements[start : start + len(records)]
+        rows["block"] = block
+        rows["lod"] = lod
+
+        for name in record.names:
+            rows[name] = records[name]
+
+        start += len(records)
+
+    if record is O_OBJECT_DTYPE:
+        placements["region_id"] = own_region_id
+
+    return placements
+
+
 if __name__ == "__main__":
     o2 = O2Reader()
 
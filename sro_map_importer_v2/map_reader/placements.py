@@ -0,0 +1,78 @@
+from typing import Iterable
+
+import numpy as np
+
+
+def placement_keys(placements: np.ndarray) -> np.ndarray:
+    # identical uids of the same owning region are the same object, see o2.hexpat
+    return (placements["region_id"].astype(np.int64) << 16) | placements["uid"]
+
+
+def collection_name(region_id: int, uid: int) -> str:
+    return f"{region_id & 0xFF}-{region_id >> 8}-{uid}"
+
+
+def batch_collection_name(x: int, y: int) -> str:
+    # static batch of a whole region, it holds no per placement collections
+    return f"{x}-{y} batch"
+
+
+def key_from_collection_name(name: str) -> int | None:
+    # "{x}-{y}-{uid}", anything else is not a placement collection
+    parts = name.split("-")
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return None
+
+    x, y, uid = (int(part) for part in parts)
+    return (((y << 8) | x) << 16) | uid
+
+
+class PlacementRegistry:
+    # sorted unique placement keys already imported
+    keys: np.ndarray
+
+    def __init__(self) -> None:
+        self.keys = np.empty(0, dtype=np.int64)
+
+        self.imported = 0
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: int) -> bool:
+        idx = np.searchsorted(self.keys, key)
+        return bool(idx < len(self.keys) and self.keys[idx] == key)
+
+    def add(self, keys: np.ndarray):
+        self.keys = np.union1d(self.keys, keys)
+
+    def add_collection_names(self, names: Iterable[str]):
+        keys = [key_from_collection_name(name) for name in names]
+        self.add(np.array([key for key in keys if key is not None], dtype=np.int64))
+
+    def known(self, keys: np.ndarray) -> np.ndarray:
+        if len(self.keys) == 0:
+            return np.zeros(len(keys), dtype=bool)
+
+        idx = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return self.keys[idx] == keys
+
+    def filter(self, placements: np.ndarray) -> np.ndarray:
+        keys = placement_keys(placements)
+
+        # first occurrence inside the batch, then drop what was imported before
+        keep = np.zeros(len(keys), dtype=bool)
+        keep[np.unique(keys, return_index=True)[1]] = True
+        keep &= ~self.known(keys)
+
+        self.add(keys[keep])
+
+        kept = int(keep.sum())
+        self.imported += kept
+        self.skipped += len(keys) - kept
+
+        return placements[keep]
+
+    def stats(self) -> str:
+        return f"{self.imported} placements kept, {self.skipped} duplicates skipped"
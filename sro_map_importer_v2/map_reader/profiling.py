@@ -0,0 +1,74 @@
+import cProfile
+import io
+import logging
+import pstats
+import re
+from pathlib import Path
+from time import strftime
+
+
+log = logging.getLogger(__name__)
+
+
+class RunProfiler:
+    # collects over any number of start / stop pairs, written once by dump
+    def __init__(self, mode: str, output_path: Path, top: int) -> None:
+        self.output_path = output_path
+        self.top = top
+
+        self.profile: cProfile.Profile | None = None
+        self.pyinstrument = None
+
+        if mode == "PYINSTRUMENT":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                log.warning("pyinstrument is not installed, using cProfile")
+            else:
+                self.pyinstrument = Profiler()
+
+        if self.pyinstrument is None:
+            self.profile = cProfile.Profile()
+
+    def start(self):
+        if self.pyinstrument is not None:
+            self.pyinstrument.start()
+        else:
+            self.profile.enable()
+
+    def stop(self):
+        if self.pyinstrument is not None:
+            # consecutive sessions are combined by pyinstrument
+            self.pyinstrument.stop()
+        else:
+            self.profile.disable()
+
+    def summary(self) -> str:
+        if self.pyinstrument is not None:
+            return self.pyinstrument.output_text()
+
+        stream = io.StringIO()
+        profile_stats = pstats.Stats(self.profile, stream=stream)
+        profile_stats.sort_stats("cumulative").print_stats(self.top)
+
+        return stream.getvalue()
+
+    def dump(self, tag: str) -> Path:
+        # <output>/<time>_<tag>.prof (or .pyisession) and the top functions as .txt
+        self.output_path.mkdir(parents=True, exist_ok=True)
+
+        tag = re.sub(r"[^\w-]+", "_", tag)
+        base = self.output_path / f"{strftime('%Y%m%d-%H%M%S')}_{tag}"
+
+        if self.pyinstrument is not None:
+            profile_path = base.with_suffix(".pyisession")
+            self.pyinstrument.last_session.save(profile_path)
+        else:
+            profile_path = base.with_suffix(".prof")
+            self.profile.dump_stats(profile_path)
+
+        base.with_suffix(".txt").write_text(self.summary())
+
+        log.info("profile written to %s", profile_path)
+
+        return profile_path
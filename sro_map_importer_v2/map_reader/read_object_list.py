@@ -1,6 +1,10 @@
+import logging
 from pathlib import Path
 
 
+log = logging.getLogger(__name__)
+
+
 def read_object_list(path: Path) -> dict[int, str]:
     resources: dict[int, str] = {}
 
@@ -10,7 +14,7 @@ def read_object_list(path: Path) -> dict[int, str]:
     header = lines[0]
     num_objects = lines[1]
 
-    print(header, num_objects)
+    log.debug("%s %s", header, num_objects)
 
     for line in lines[2:]:
         res_id, rest = line.split(b" ", 1)
@@ -0,0 +1,321 @@
+"""
+world-wide spatial index of every .o2 placement, in global units
+(x = region_x * 1920 + local x, z = region_y * 1920 + local z, y up)
+
+usage (from the sro_map_importer_v2 folder, no blender required):
+    python -m map_reader.spatial_index <Map path> <Data path> <output .npz>
+"""
+
+import argparse
+import logging
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+from .bsr import BSRReader
+from .mfile import REGION_SIZE
+from .object_list import read_object_list
+from .ofile import read_placements, region_id
+from .placements import placement_keys
+
+
+log = logging.getLogger(__name__)
+
+
+# a quarter region per cell keeps the whole world grid around a million cells
+CELL_SIZE = REGION_SIZE / 4
+
+ENTRY_DTYPE = np.dtype(
+    [
+        ("ob_id", "<u4"),
+        ("uid", "<u2"),
+        ("region_id", "<u2"),
+        ("x", "<f4"),
+        ("y", "<f4"),
+        ("z", "<f4"),
+        ("yaw", "<f4"),
+        ("min", "<f4", (3,)),
+        ("max", "<f4", (3,)),
+    ]
+)
+
+
+def scan_placement_files(map_path: Path) -> list[tuple[int, int, Path]]:
+    files: list[tuple[int, int, Path]] = []
+
+    for y_dir in map_path.iterdir():
+        if not y_dir.is_dir() or not y_dir.name.isdigit():
+            continue
+
+        for o_path in y_dir.glob("*.o2"):
+            if o_path.stem.isdigit():
+                files.append((int(o_path.stem), int(y_dir.name), o_path))
+
+    files.sort(key=lambda item: (item[1], item[0]))
+
+    return files
+
+
+def read_resource_bboxes(
+    data_path: Path, resources: dict[int, str], ob_ids: np.ndarray
+) -> dict[int, np.ndarray]:
+    # local (min xyz, max xyz) per resource, from the bsr bounding box
+    bboxes: dict[int, np.ndarray] = {}
+    bsr = BSRReader()
+
+    for ob_id in ob_ids.tolist():
+        bbox = np.zeros(6, dtype=np.float32)
+
+        resource = resources.get(ob_id)
+        if resource is not None:
+            resource_path = data_path / resource
+            try:
+                if resource_path.exists() and bsr.read(resource_path) is not None:
+                    bbox = np.array(bsr.bbox_info.bbox, dtype=np.float32)
+            except Exception as e:
+                log.warning("bbox not read %s: %s", resource_path, e)
+
+        bboxes[ob_id] = bbox
+
+    return bboxes
+
+
+def world_bounds(entries: np.ndarray, bboxes: dict[int, np.ndarray]):
+    # axis aligned box of the bsr box rotated by yaw around the up axis
+    local = np.stack([bboxes[int(ob_id)] for ob_id in entries["ob_id"]])
+    local_min, local_max = local[:, :3], local[:, 3:]
+
+    center = (local_min + local_max) / 2
+    half = (local_max - local_min) / 2
+
+    cos = np.cos(entries["yaw"])
+    sin = np.sin(entries["yaw"])
+
+    center_x = entries["x"] + center[:, 0] * cos - center[:, 2] * sin
+    center_z = entries["z"] + center[:, 0] * sin + center[:, 2] * cos
+
+    half_x = np.abs(cos) * half[:, 0] + np.abs(sin) * half[:, 2]
+    half_z = np.abs(sin) * half[:, 0] + np.abs(cos) * half[:, 2]
+
+    entries["min"][:, 0] = center_x - half_x
+    entries["max"][:, 0] = center_x + half_x
+    entries["min"][:, 1] = entries["y"] + local_min[:, 1]
+    entries["max"][:, 1] = entries["y"] + local_max[:, 1]
+    entries["min"][:, 2] = center_z - half_z
+    entries["max"][:, 2] = center_z + half_z
+
+
+def aabb_in_frustum(mins: np.ndarray, maxs: np.ndarray, planes: np.ndarray):
+    # planes are (K, 4) a*x + b*y + c*z + d >= 0 inside, a box is kept unless it is
+    # completely behind one plane
+    inside = np.ones(len(mins), dtype=bool)
+
+    for plane in planes:
+        normal, d = plane[:3], plane[3]
+        # corner furthest along the plane normal
+        corner = np.where(normal >= 0, maxs, mins)
+        inside &= corner @ normal + d >= 0
+
+    return inside
+
+
+class SpatialIndex:
+    entries: np.ndarray
+
+    # uniform grid over x / z, cell (row = z, col = x) lists entry indices in CSR form
+    origin: np.ndarray
+    shape: tuple[int, int]
+    offsets: np.ndarray
+    indices: np.ndarray
+
+    def __init__(self, entries: np.ndarray, cell_size: float = CELL_SIZE) -> None:
+        self.entries = entries
+        self.cell_size = cell_size
+
+        if len(entries) == 0:
+            self.origin = np.zeros(2, dtype=np.float32)
+            self.shape = (0, 0)
+            self.offsets = np.zeros(1, dtype=np.int64)
+            self.indices = np.empty(0, dtype=np.int32)
+            return
+
+        mins = entries["min"][:, [0, 2]]
+        maxs = entries["max"][:, [0, 2]]
+
+        self.origin = np.floor(mins.min(axis=0) / cell_size) * cell_size
+        cells_max = np.floor((maxs.max(axis=0) - self.origin) / cell_size).astype(int)
+        self.shape = (int(cells_max[1]) + 1, int(cells_max[0]) + 1)
+
+        c0 = self.cell_coords(mins)
+        c1 = self.cell_coords(maxs)
+
+        # expand every entry over the cells its box covers
+        widths = c1[:, 0] - c0[:, 0] + 1
+        heights = c1[:, 1] - c0[:, 1] + 1
+        counts = widths * heights
+
+        entry = np.repeat(np.arange(len(entries)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        cols = c0[entry, 0] + local % widths[entry]
+        rows = c0[entry, 1] + local // widths[entry]
+        cells = rows * self.shape[1] + cols
+
+        order = np.argsort(cells, kind="stable")
+        self.indices = entry[order].astype(np.int32)
+
+        self.offsets = np.zeros(self.shape[0] * self.shape[1] + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(cells, minlength=self.shape[0] * self.shape[1]),
+            out=self.offsets[1:],
+        )
+
+    def cell_coords(self, points: np.ndarray) -> np.ndarray:
+        coords = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        return np.clip(coords, 0, np.array(self.shape[::-1]) - 1)
+
+    def candidates(self, min_x: float, min_z: float, max_x: float, max_z: float):
+        if len(self.entries) == 0:
+            return np.empty(0, dtype=np.int32)
+
+        (col0, row0), (col1, row1) = self.cell_coords(
+            np.array([[min_x, min_z], [max_x, max_z]], dtype=np.float64)
+        )
+
+        width = self.shape[1]
+        chunks = [
+            self.indices[
+                self.offsets[row * width + col0] : self.offsets[row * width + col1 + 1]
+            ]
+            for row in range(row0, row1 + 1)
+        ]
+
+        return np.unique(np.concatenate(chunks))
+
+    def query_rect(self, min_x: float, min_z: float, max_x: float, max_z: float):
+        idx = self.candidates(min_x, min_z, max_x, max_z)
+
+        mins = self.entries["min"][idx]
+        maxs = self.entries["max"][idx]
+
+        overlap = (
+            (mins[:, 0] <= max_x)
+            & (maxs[:, 0] >= min_x)
+            & (mins[:, 2] <= max_z)
+            & (maxs[:, 2] >= min_z)
+        )
+
+        return idx[overlap]
+
+    def query_radius(self, x: float, z: float, radius: float):
+        idx = self.candidates(x - radius, z - radius, x + radius, z + radius)
+
+        mins = self.entries["min"][idx]
+        maxs = self.entries["max"][idx]
+
+        # distance from the point to the closest point of each box
+        dx = np.maximum(np.maximum(mins[:, 0] - x, 0), x - maxs[:, 0])
+        dz = np.maximum(np.maximum(mins[:, 2] - z, 0), z - maxs[:, 2])
+
+        return idx[dx * dx + dz * dz <= radius * radius]
+
+    def query_frustum(
+        self, planes: np.ndarray, bounds: tuple[float, float, float, float] | None = None
+    ):
+        # bounds (min_x, min_z, max_x, max_z) of the frustum limit the cells visited
+        if bounds is None:
+            idx = np.arange(len(self.entries), dtype=np.int32)
+        else:
+            idx = self.candidates(*bounds)
+
+        inside = aabb_in_frustum(
+            self.entries["min"][idx], self.entries["max"][idx], planes
+        )
+
+        return idx[inside]
+
+    def save(self, path: Path):
+        np.savez(
+            path,
+            entries=self.entries,
+            cell_size=np.float64(self.cell_size),
+            origin=self.origin,
+            shape=np.array(self.shape, dtype=np.int64),
+            offsets=self.offsets,
+            indices=self.indices,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "SpatialIndex":
+        index = cls.__new__(cls)
+
+        with np.load(path) as data:
+            index.entries = data["entries"]
+            index.cell_size = float(data["cell_size"])
+            index.origin = data["origin"]
+            index.shape = tuple(int(v) for v in data["shape"])
+            index.offsets = data["offsets"]
+            index.indices = data["indices"]
+
+        return index
+
+
+def build_spatial_index(map_path: Path, data_path: Path) -> SpatialIndex:
+    start = perf_counter()
+
+    files = scan_placement_files(map_path)
+
+    chunks: list[np.ndarray] = []
+    for x, y, o_path in files:
+        placements = read_placements(o_path, region_id(x, y))
+
+        entries = np.zeros(len(placements), dtype=ENTRY_DTYPE)
+        for name in ("ob_id", "uid", "region_id", "y", "yaw"):
+            entries[name] = placements[name]
+
+        entries["x"] = placements["x"] + x * REGION_SIZE
+        entries["z"] = placements["z"] + y * REGION_SIZE
+
+        chunks.append(entries)
+
+    entries = np.concatenate(chunks) if chunks else np.zeros(0, dtype=ENTRY_DTYPE)
+
+    # neighbouring regions repeat the objects they share
+    _, first = np.unique(placement_keys(entries), return_index=True)
+    entries = entries[np.sort(first)]
+
+    resources = read_object_list(map_path / "object.ifo")
+    bboxes = read_resource_bboxes(data_path, resources, np.unique(entries["ob_id"]))
+
+    if len(entries):
+        world_bounds(entries, bboxes)
+
+    index = SpatialIndex(entries)
+
+    log.info(
+        "%d placements from %d regions indexed in %.2fs",
+        len(entries),
+        len(files),
+        perf_counter() - start,
+    )
+
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="build the placement spatial index")
+    parser.add_argument("map_path", type=Path, help="SRO Map folder")
+    parser.add_argument("data_path", type=Path, help="SRO Data folder")
+    parser.add_argument("output_path", type=Path, help="output .npz")
+
+    args = parser.parse_args()
+
+    start = perf_counter()
+    index = build_spatial_index(args.map_path, args.data_path)
+    index.save(args.output_path)
+
+    print(
+        f"[ SpatialIndex ] {len(index.entries)} placements indexed to "
+        f"{args.output_path} in {perf_counter() - start:.2f}s"
+    )
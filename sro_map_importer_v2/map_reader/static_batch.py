@@ -0,0 +1,105 @@
+import bpy
+import numpy as np
+
+
+def mesh_arrays(data: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # load_bms output as (V, 3) vertices, (F, 3) triangles and (V, 2) uvs
+    vertices = np.array(data["vertices"], dtype=np.float32).reshape(-1, 3)
+    faces = np.array(data["faces"], dtype=np.int32).reshape(-1, 3)
+    uvs = np.array(data["vertices_uv"], dtype=np.float32).reshape(-1, 2)
+
+    return vertices, faces, uvs
+
+
+def mesh_from_arrays(
+    name: str, vertices: np.ndarray, faces: np.ndarray, uvs: np.ndarray | None = None
+) -> bpy.types.Mesh:
+    # triangles only, uvs are per vertex and spread to the loops
+    mesh = bpy.data.meshes.new(name)
+
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", vertices.astype(np.float32).ravel())
+
+    loops = faces.astype(np.int32).ravel()
+    mesh.loops.add(len(loops))
+    mesh.loops.foreach_set("vertex_index", loops)
+
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, len(loops), 3, dtype=np.int32))
+
+    if uvs is not None and len(uvs):
+        uv_layer = mesh.uv_layers.new(name="UVMap")
+        uv_layer.data.foreach_set("uv", uvs[loops].astype(np.float32).ravel())
+
+    mesh.update(calc_edges=True)
+    mesh.validate()
+
+    return mesh
+
+
+class StaticBatch:
+    # per material transformed copies, merged when the batch is built
+    parts: dict[str, list[tuple[np.ndarray, np.ndarray, np.ndarray]]]
+
+    def __init__(self) -> None:
+        self.parts = {}
+
+    def add(
+        self,
+        material: str,
+        vertices: np.ndarray,
+        faces: np.ndarray,
+        uvs: np.ndarray,
+        matrices: np.ndarray,
+    ):
+        # every (4, 4) matrix places one copy of the mesh
+        count = len(matrices)
+        if count == 0 or len(vertices) == 0:
+            return
+
+        world = (
+            np.einsum("pij,vj->pvi", matrices[:, :3, :3], vertices)
+            + matrices[:, None, :3, 3]
+        )
+        offsets = np.arange(count, dtype=np.int32) * len(vertices)
+        copies = faces[None] + offsets[:, None, None]
+
+        self.parts.setdefault(material, []).append(
+            (
+                world.reshape(-1, 3).astype(np.float32),
+                copies.reshape(-1, 3),
+                np.tile(uvs, (count, 1)),
+            )
+        )
+
+    def merged(self, material: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        parts = self.parts[material]
+
+        counts = np.array([len(vertices) for vertices, _, _ in parts])
+        offsets = np.cumsum(counts) - counts
+
+        vertices = np.concatenate([vertices for vertices, _, _ in parts])
+        faces = np.concatenate(
+            [faces + offset for (_, faces, _), offset in zip(parts, offsets.tolist())]
+        )
+        uvs = np.concatenate([uvs for _, _, uvs in parts])
+
+        return vertices, faces, uvs
+
+    def build(self, prefix: str) -> list[bpy.types.Object]:
+        obs: list[bpy.types.Object] = []
+
+        for material in self.parts:
+            name = f"{prefix} {material}"
+
+            mesh = mesh_from_arrays(name, *self.merged(material))
+
+            mat = bpy.data.materials.get(material)
+            if mat is not None:
+                mesh.materials.append(mat)
+
+            obs.append(bpy.data.objects.new(name, mesh))
+
+        self.parts = {}
+
+        return obs
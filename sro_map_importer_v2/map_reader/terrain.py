@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from .height_atlas import HeightAtlas
+from .mfile import REGION_VERTICES, TILE_SIZE
+from .mfile import read_region_heights, region_path
+
+
+class TerrainSampler:
+    """
+    bilinear terrain height queries in .o2 region space (0..1920 on x and z),
+    decoded regions are kept in a LRU cache
+    """
+
+    regions: OrderedDict[tuple[int, int], np.ndarray | None]
+
+    def __init__(
+        self, map_path: Path, cache_size: int = 64, atlas: HeightAtlas | None = None
+    ) -> None:
+        self.map_path = map_path
+        self.cache_size = cache_size
+        self.atlas = atlas
+
+        self.regions = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def region(self, x: int, y: int) -> np.ndarray | None:
+        key = (x, y)
+
+        if key in self.regions:
+            self.hits += 1
+            self.regions.move_to_end(key)
+            return self.regions[key]
+
+        self.misses += 1
+
+        heights: np.ndarray | None = None
+
+        if self.atlas is not None and self.atlas.contains(x, y):
+            heights = np.asarray(self.atlas.region(x, y))
+        else:
+            path = region_path(self.map_path, x, y)
+            if path.exists():
+                heights = read_region_heights(path)
+
+        # missing regions are cached too, so repeated misses stay cheap
+        self.regions[key] = heights
+
+        if len(self.regions) > self.cache_size:
+            self.regions.popitem(last=False)
+
+        return heights
+
+    def clear(self):
+        self.regions.clear()
+
+    @staticmethod
+    def sample(heights: np.ndarray, local_x: np.ndarray, local_z: np.ndarray):
+        last = REGION_VERTICES - 1
+
+        fx = np.clip(np.asarray(local_x, dtype=np.float64) / TILE_SIZE, 0, last)
+        fz = np.clip(np.asarray(local_z, dtype=np.float64) / TILE_SIZE, 0, last)
+
+        col = np.minimum(fx.astype(np.intp), last - 1)
+        row = np.minimum(fz.astype(np.intp), last - 1)
+
+        tx = fx - col
+        tz = fz - row
+
+        h00 = heights[row, col]
+        h01 = heights[row, col + 1]
+        h10 = heights[row + 1, col]
+        h11 = heights[row + 1, col + 1]
+
+        top = h00 + (h01 - h00) * tx
+        bottom = h10 + (h11 - h10) * tx
+
+        return top + (bottom - top) * tz
+
+    def height_at(
+        self, region_x: int, region_y: int, local_x: float, local_z: float
+    ) -> float:
+        heights = self.region(region_x, region_y)
+
+        if heights is None:
+            return float("nan")
+
+        return float(self.sample(heights, np.float64(local_x), np.float64(local_z)))
+
+    def heights_at(self, region_x, region_y, local_x, local_z) -> np.ndarray:
+        region_x, region_y, local_x, local_z = np.broadcast_arrays(
+            np.asarray(region_x, dtype=np.int64),
+            np.asarray(region_y, dtype=np.int64),
+            np.asarray(local_x, dtype=np.float64),
+            np.asarray(local_z, dtype=np.float64),
+        )
+
+        result = np.full(region_x.shape, np.nan, dtype=np.float64)
+
+        keys = (region_y << 16) | (region_x & 0xFFFF)
+        unique_keys, inverse = np.unique(keys.ravel(), return_inverse=True)
+        inverse = inverse.reshape(keys.shape)
+
+        for idx, key in enumerate(unique_keys):
+            heights = self.region(int(key) & 0xFFFF, int(key) >> 16)
+            if heights is None:
+                continue
+
+            mask = inverse == idx
+            result[mask] = self.sample(heights, local_x[mask], local_z[mask])
+
+        return result
@@ -0,0 +1,59 @@
+import logging
+from pathlib import Path
+from typing import TypedDict
+
+
+log = logging.getLogger(__name__)
+
+
+class TextureIndex(TypedDict):
+    _id: int
+    addr: int
+    map_name: str
+    file_name: str
+
+
+def read_tile2d_ifo(tile2d_ifo_path: Path) -> dict[int, TextureIndex]:
+    if not tile2d_ifo_path.exists():
+        raise FileNotFoundError(
+            "tile2d.ifo not found! make sure the map_path points to the MAP data folder"
+        )
+
+    with open(tile2d_ifo_path, "r") as f:
+        lines = f.readlines()
+
+    # header = lines[0]
+    # version = lines[1]
+
+    result: dict[int, TextureIndex] = {}
+
+    for line in lines[2:]:
+        # format: 00000 0x00000000 "CJfild" "c_dust_fld_01.ddj"
+        _id, addr, *rest = line.split(" ")
+
+        if len(rest) == 2:
+            map_name, file_name = rest
+        else:
+            rest = " ".join(rest)
+            map_name, file_name = rest.split('" "')
+            if " {" in file_name:
+                file_name = file_name.split(" {")[0]
+
+        _id = int(_id)
+        addr = int(addr, 16)
+        file_name = file_name.strip().strip('"')
+
+        if not file_name.endswith(".ddj"):
+            log.error("unexpected texture line %r", line)
+            raise ValueError("problem parsing tile2d.ifo")
+
+        value: TextureIndex = {
+            "_id": _id,
+            "addr": addr,
+            "map_name": map_name.strip('"'),
+            "file_name": file_name,
+        }
+
+        result[_id] = value
+
+    return result
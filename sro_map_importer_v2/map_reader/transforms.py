@@ -0,0 +1,46 @@
+import numpy as np
+
+from .mfile import REGION_SIZE
+
+
+# a region is 1920 .o2 units and 6 blender units wide
+UNIT_SCALE = 6 / REGION_SIZE
+
+
+def region_origin(x_offset: int, y_offset: int) -> tuple[float, float]:
+    # terrain grids are centered on their block, hence the half unit
+    return (x_offset * 6) - 0.5, (y_offset * 6) - 0.5
+
+
+def placement_matrices(
+    placements: np.ndarray, x_offset: int, y_offset: int
+) -> np.ndarray:
+    # (N, 4, 4) world matrices, translation * rotation_z(yaw) * uniform scale
+    count = len(placements)
+
+    origin_x, origin_y = region_origin(x_offset, y_offset)
+
+    yaw = placements["yaw"].astype(np.float64)
+    cos = np.cos(yaw) * UNIT_SCALE
+    sin = np.sin(yaw) * UNIT_SCALE
+
+    matrices = np.zeros((count, 4, 4), dtype=np.float32)
+
+    matrices[:, 0, 0] = cos
+    matrices[:, 0, 1] = -sin
+    matrices[:, 1, 0] = sin
+    matrices[:, 1, 1] = cos
+    matrices[:, 2, 2] = UNIT_SCALE
+    matrices[:, 3, 3] = 1
+
+    # .o2 is y up, blender is z up
+    matrices[:, 0, 3] = placements["x"] * UNIT_SCALE + origin_x
+    matrices[:, 1, 3] = placements["z"] * UNIT_SCALE + origin_y
+    matrices[:, 2, 3] = placements["y"] * UNIT_SCALE
+
+    return matrices
+
+
+def flatten_for_blender(matrices: np.ndarray) -> np.ndarray:
+    # foreach_set on matrix properties expects column major floats
+    return np.ascontiguousarray(matrices.transpose(0, 2, 1), dtype=np.float32).ravel()
@@ -0,0 +1,104 @@
+import bpy
+
+from .map_reader.memory import MemoryTracker, deep_size, format_bytes
+
+
+# bytes per element of mesh attribute data types
+ATTRIBUTE_SIZES = {
+    "FLOAT": 4,
+    "INT": 4,
+    "FLOAT_VECTOR": 12,
+    "FLOAT_COLOR": 16,
+    "BYTE_COLOR": 4,
+    "BOOLEAN": 1,
+    "FLOAT2": 8,
+    "INT8": 1,
+    "INT32_2D": 8,
+    "QUATERNION": 16,
+    "FLOAT4X4": 64,
+}
+
+
+def mesh_bytes(mesh: bpy.types.Mesh) -> int:
+    # attribute data plus the topology arrays, approximate
+    size = len(mesh.loops) * 8 + len(mesh.edges) * 8 + len(mesh.polygons) * 8
+
+    for attribute in mesh.attributes:
+        size += len(attribute.data) * ATTRIBUTE_SIZES.get(attribute.data_type, 4)
+
+    for uv_layer in mesh.uv_layers:
+        size += len(uv_layer.data) * 8
+
+    return size
+
+
+def image_bytes(image: bpy.types.Image) -> int:
+    # decoded size of loaded images, reading the size of the others would load them
+    if not image.has_data:
+        return 0
+
+    width, height = image.size
+    return width * height * image.channels * (4 if image.is_float else 1)
+
+
+def datablock_totals() -> dict[str, int]:
+    return {
+        "objects": len(bpy.data.objects),
+        "collections": len(bpy.data.collections),
+        "materials": len(bpy.data.materials),
+        "meshes": len(bpy.data.meshes),
+        "mesh_bytes": sum(mesh_bytes(mesh) for mesh in bpy.data.meshes),
+        "images": len(bpy.data.images),
+        "image_bytes": sum(image_bytes(image) for image in bpy.data.images),
+    }
+
+
+def totals_delta(before: dict[str, int], after: dict[str, int]) -> dict[str, int]:
+    return {key: after[key] - before.get(key, 0) for key in after}
+
+
+def format_totals(totals: dict[str, int]) -> str:
+    return ", ".join(
+        f"{key} {format_bytes(value) if key.endswith('_bytes') else value}"
+        for key, value in totals.items()
+    )
+
+
+def cache_sizes(session) -> dict[str, int]:
+    # bytes held by the parsed data the importer session keeps between runs
+    sizes: dict[str, int] = {}
+
+    m = session.objects_importer
+    if m is not None:
+        sizes["resources"] = deep_size(m.resources)
+        sizes["bsr_cache"] = deep_size(m.bsr_cache)
+        sizes["mesh_cache"] = deep_size(m.mesh_cache)
+        sizes["array_cache"] = deep_size(m.array_cache)
+        sizes["registry"] = deep_size(m.registry)
+
+    b = session.map_importer
+    if b is not None:
+        sizes["texture_map"] = deep_size(b.texture_map)
+
+    return sizes
+
+
+def memory_report(tracker: MemoryTracker, session) -> str:
+    peak, diff = tracker.stop()
+
+    lines = [f"python peak {format_bytes(peak)}"]
+
+    for name, size in cache_sizes(session).items():
+        lines.append(f"{name:<20} {format_bytes(size):>12}")
+
+    for stat in diff:
+        lines.append(
+            f"{stat.traceback[0].filename:<60} {format_bytes(stat.size_diff):>12}"
+        )
+
+    for name, delta in tracker.regions:
+        lines.append(f"{name:<20} {format_totals(delta)}")
+
+    lines.append(f"scene {format_totals(datablock_totals())}")
+
+    return "\n".join(lines)
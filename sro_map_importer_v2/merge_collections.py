@@ -1,32 +1,129 @@
+import logging
+
 import bpy
+import numpy as np
 
-def merge_meshes_in_collections():
-    context = bpy.context
-    assert context
+from .map_reader.instrument import stats
+from .map_reader.placements import key_from_collection_name
 
-    bpy.ops.object.select_all(action='DESELECT')
 
-    for collection in bpy.data.collections:
-        print(f"processing collection: {collection.name}")
-        meshes = [obj for obj in collection.objects if obj.type == 'MESH']
+log = logging.getLogger(__name__)
 
-        if len(meshes) == 0:
-            print(f"  No meshes found in collection: {collection.name}")
-            continue
 
-        for ob in meshes:
-            ob.select_set(True)
+def object_arrays(ob: bpy.types.Object, materials: list[bpy.types.Material]):
+    # world space copy of the mesh, material indices remapped into materials
+    mesh = ob.data
+
+    vertex_count = len(mesh.vertices)
+    loop_count = len(mesh.loops)
+    polygon_count = len(mesh.polygons)
+
+    co = np.empty(vertex_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+
+    matrix = np.array(ob.matrix_world, dtype=np.float32)
+    co = co.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+
+    loops = np.empty(loop_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loops)
+
+    loop_starts = np.empty(polygon_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+
+    uvs = np.zeros(loop_count * 2, dtype=np.float32)
+    if mesh.uv_layers.active is not None:
+        mesh.uv_layers.active.data.foreach_get("uv", uvs)
+
+    material_indices = np.empty(polygon_count, dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", material_indices)
+
+    slots = []
+    for material in mesh.materials:
+        if material not in materials:
+            materials.append(material)
+        slots.append(materials.index(material))
+
+    if slots:
+        slot_map = np.array(slots, dtype=np.int32)
+        material_indices = slot_map[np.minimum(material_indices, len(slots) - 1)]
+    else:
+        material_indices[:] = 0
+
+    return co, loops, loop_starts, uvs.reshape(-1, 2), material_indices
+
+
+@stats.timed("build.merge")
+def merge_objects(name: str, obs: list[bpy.types.Object]) -> bpy.types.Object:
+    materials: list[bpy.types.Material] = []
+    parts = [object_arrays(ob, materials) for ob in obs]
+
+    vertex_offset = 0
+    loop_offset = 0
 
-        context.view_layer.objects.active = meshes[0]
+    vertices, loops, loop_starts, uvs, material_indices = [], [], [], [], []
+    for co, ob_loops, ob_loop_starts, ob_uvs, ob_material_indices in parts:
+        vertices.append(co)
+        loops.append(ob_loops + vertex_offset)
+        loop_starts.append(ob_loop_starts + loop_offset)
+        uvs.append(ob_uvs)
+        material_indices.append(ob_material_indices)
 
-        bpy.ops.object.join()
+        vertex_offset += len(co)
+        loop_offset += len(ob_loops)
 
-        merged_mesh = context.view_layer.objects.active
-        merged_mesh.name = f"{collection.name}_merged"
+    mesh = bpy.data.meshes.new(name)
 
-        print(f"  Meshes merged into: {merged_mesh.name}")
+    mesh.vertices.add(vertex_offset)
+    mesh.vertices.foreach_set("co", np.concatenate(vertices).ravel())
+
+    mesh.loops.add(loop_offset)
+    mesh.loops.foreach_set("vertex_index", np.concatenate(loops))
+
+    loop_starts = np.concatenate(loop_starts)
+    mesh.polygons.add(len(loop_starts))
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    mesh.polygons.foreach_set("material_index", np.concatenate(material_indices))
+
+    uv_layer = mesh.uv_layers.new(name="UVMap")
+    uv_layer.data.foreach_set("uv", np.concatenate(uvs).ravel())
+
+    for material in materials:
+        mesh.materials.append(material)
+
+    mesh.update(calc_edges=True)
+
+    return bpy.data.objects.new(name, mesh)
+
+
+def placement_collections(region_prefix: str = "") -> list[bpy.types.Collection]:
+    # only collections created for placements, "{x}-{y}-{uid}"
+    return [
+        collection
+        for collection in bpy.data.collections
+        if collection.library is None
+        and key_from_collection_name(collection.name) is not None
+        and collection.name.startswith(region_prefix)
+    ]
+
+
+def merge_meshes_in_collections(region_prefix: str = "") -> int:
+    merged = 0
+
+    for collection in placement_collections(region_prefix):
+        meshes = [ob for ob in collection.objects if ob.type == "MESH"]
+
+        if len(meshes) == 0:
+            continue
+
+        merged_ob = merge_objects(f"{collection.name}_merged", meshes)
+        collection.objects.link(merged_ob)
+
+        for ob in meshes:
+            bpy.data.objects.remove(ob)
 
-        bpy.ops.object.select_all(action='DESELECT')
+        merged += 1
+        stats.count("merged_meshes", len(meshes))
 
+    log.info("%d collections merged", merged)
 
-merge_meshes_in_collections()
\ No newline at end of file
+    return merged
@@ -0,0 +1,141 @@
+import bpy
+from pathlib import Path
+
+from .batch import region_blend_path, region_collection_name
+
+
+LINKED_COLLECTION_NAME = "sro_linked_regions"
+
+
+def get_linked_root() -> bpy.types.Collection:
+    context = bpy.context
+    assert context
+
+    root = bpy.data.collections.get(LINKED_COLLECTION_NAME)
+    if root is None:
+        root = bpy.data.collections.new(LINKED_COLLECTION_NAME)
+
+    if root.name not in context.scene.collection.children:
+        context.scene.collection.children.link(root)
+
+    return root
+
+
+def parse_region_name(name: str) -> tuple[int, int] | None:
+    # "x: {x}, y: {y}"
+    try:
+        x, y = name.split(",")
+        return int(x.split(":")[-1].strip()), int(y.split(":")[-1].strip())
+    except ValueError:
+        return None
+
+
+def linked_regions() -> dict[tuple[int, int], bpy.types.Collection]:
+    root = bpy.data.collections.get(LINKED_COLLECTION_NAME)
+    if root is None:
+        return {}
+
+    regions: dict[tuple[int, int], bpy.types.Collection] = {}
+    for collection in root.children:
+        if collection.library is None:
+            continue
+
+        key = parse_region_name(collection.name)
+        if key is not None:
+            regions[key] = collection
+
+    return regions
+
+
+def link_region(baked_path: Path, x: int, y: int) -> bool:
+    name = region_collection_name(x, y)
+    blend_path = region_blend_path(baked_path, x, y)
+
+    if (x, y) in linked_regions():
+        return True
+
+    if not blend_path.exists():
+        return False
+
+    with bpy.data.libraries.load(blend_path.as_posix(), link=True) as (
+        data_from,
+        data_to,
+    ):
+        if name in data_from.collections:
+            data_to.collections = [name]
+
+    collections = [c for c in data_to.collections if c is not None]
+    if not collections:
+        # loading creates the library even when nothing is linked from it
+        remove_library(blend_path)
+        return False
+
+    root = get_linked_root()
+    for collection in collections:
+        root.children.link(collection)
+
+    return True
+
+
+def remove_library(blend_path: Path):
+    for library in list(bpy.data.libraries):
+        if Path(bpy.path.abspath(library.filepath)).resolve() == blend_path.resolve():
+            bpy.data.libraries.remove(library)
+
+
+def unlink_region(collection: bpy.types.Collection):
+    root = bpy.data.collections.get(LINKED_COLLECTION_NAME)
+    if root is not None and collection.name in root.children:
+        root.children.unlink(collection)
+
+    # every region lives in its own file, removing the library drops all of its data
+    library = collection.library
+    if library is not None:
+        bpy.data.libraries.remove(library)
+
+
+def assemble_window(
+    baked_path: Path,
+    x_start: int,
+    x_size: int,
+    y_start: int,
+    y_size: int,
+    unload_outside: bool = True,
+) -> tuple[int, int, int]:
+    window = {
+        (x, y)
+        for y in range(y_start, y_start + y_size)
+        for x in range(x_start, x_start + x_size)
+    }
+
+    current = linked_regions()
+
+    unloaded = 0
+    if unload_outside:
+        for key, collection in current.items():
+            if key in window:
+                continue
+            unlink_region(collection)
+            unloaded += 1
+
+    linked = 0
+    missing = 0
+    for x, y in sorted(window):
+        if (x, y) in current:
+            continue
+
+        if link_region(baked_path, x, y):
+            linked += 1
+        else:
+            missing += 1
+
+    return linked, unloaded, missing
+
+
+def unload_all() -> int:
+    regions = linked_regions()
+
+    for collection in regions.values():
+        unlink_region(collection)
+
+    return len(regions)
@@ -0,0 +1,156 @@
+import bpy
+from pathlib import Path
+
+from .batch import region_collection_name
+from .map_reader.fingerprint import (
+    OBJECT_SUFFIXES,
+    TERRAIN_SUFFIXES,
+    changed_suffixes,
+    region_fingerprints,
+)
+from .map_reader.placements import batch_collection_name, key_from_collection_name
+from .map_reader.ofile import region_id
+
+
+# custom property of the region terrain object, source suffix -> size, mtime, hash
+FINGERPRINT_PROPERTY = "sro_fingerprint"
+
+# object source fingerprints of terrain removed for a rebuild, region path -> entries
+kept_fingerprints: dict[str, dict] = {}
+
+
+def region_object(region_path: Path) -> bpy.types.Object | None:
+    # terrain object of Map/{y}/{x}
+    x, y = int(region_path.stem), int(region_path.parent.stem)
+    return bpy.data.objects.get(region_collection_name(x, y))
+
+
+def stored_fingerprints(ob: bpy.types.Object) -> dict | None:
+    value = ob.get(FINGERPRINT_PROPERTY)
+    if value is None:
+        return None
+
+    return value.to_dict()
+
+
+def store_fingerprints(region_path: Path, suffixes: tuple[str, ...]):
+    # replaces the entries of suffixes, the others keep what was imported before
+    ob = region_object(region_path)
+    if ob is None:
+        return
+
+    fingerprints = stored_fingerprints(ob)
+    if fingerprints is None:
+        if suffixes != TERRAIN_SUFFIXES:
+            # terrain imported before fingerprints were stored stays untracked
+            return
+
+        fingerprints = kept_fingerprints.pop(region_path.as_posix(), {})
+
+    for suffix in suffixes:
+        fingerprints.pop(suffix, None)
+
+    fingerprints.update(region_fingerprints(region_path, suffixes))
+    ob[FINGERPRINT_PROPERTY] = fingerprints
+
+
+def region_changes(region_path: Path, objects: bool) -> set[str] | None:
+    # changed source suffixes of an imported region, None for regions imported
+    # before fingerprints were stored
+    ob = region_object(region_path)
+    if ob is None:
+        return None
+
+    stored = stored_fingerprints(ob)
+    if stored is None:
+        return None
+
+    suffixes = TERRAIN_SUFFIXES
+    if objects and any(suffix in stored for suffix in OBJECT_SUFFIXES):
+        # objects were imported for the region before, their sources count too
+        suffixes += OBJECT_SUFFIXES
+
+    return changed_suffixes(stored, region_path, suffixes)
+
+
+def remove_object(ob: bpy.types.Object):
+    # the mesh and materials go too, unless something else still uses them
+    data = ob.data
+    materials = list(data.materials) if isinstance(data, bpy.types.Mesh) else []
+
+    bpy.data.objects.remove(ob)
+
+    if isinstance(data, bpy.types.Mesh) and data.users == 0:
+        bpy.data.meshes.remove(data)
+
+    for material in materials:
+        if material is not None and material.users == 0:
+            bpy.data.materials.remove(material)
+
+
+def region_object_collections(region_path: Path) -> list[bpy.types.Collection]:
+    # placement collections owned by the region and its static batch collection
+    x, y = int(region_path.stem), int(region_path.parent.stem)
+    owner = region_id(x, y)
+
+    collections = []
+    for collection in bpy.data.collections:
+        if collection.library is not None:
+            continue
+
+        key = key_from_collection_name(collection.name)
+        if (key is not None and key >> 16 == owner) or (
+            collection.name == batch_collection_name(x, y)
+        ):
+            collections.append(collection)
+
+    return collections
+
+
+def remove_region_objects(region_path: Path) -> int:
+    collections = region_object_collections(region_path)
+
+    for collection in collections:
+        for ob in list(collection.objects):
+            remove_object(ob)
+
+        bpy.data.collections.remove(collection)
+
+    return len(collections)
+
+
+def remove_changed_regions(regions: list[Path], objects: bool) -> dict[str, int]:
+    # drops what changed since it was imported so the import rebuilds it,
+    # returns how many regions are new, changed, unchanged or untracked
+    report = {"new": 0, "changed": 0, "unchanged": 0, "untracked": 0}
+
+    for region_path in regions:
+        ob = region_object(region_path)
+        if ob is None:
+            report["new"] += 1
+            continue
+
+        changes = region_changes(region_path, objects)
+        if changes is None:
+            report["untracked"] += 1
+            continue
+
+        if not changes:
+            report["unchanged"] += 1
+            continue
+
+        report["changed"] += 1
+
+        if changes.intersection(TERRAIN_SUFFIXES):
+            stored = stored_fingerprints(ob) or {}
+            kept_fingerprints[region_path.as_posix()] = {
+                suffix: stored[suffix]
+                for suffix in OBJECT_SUFFIXES
+                if suffix in stored and suffix not in changes
+            }
+            remove_object(ob)
+
+        if changes.intersection(OBJECT_SUFFIXES):
+            remove_region_objects(region_path)
+
+    return report